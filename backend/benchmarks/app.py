@@ -0,0 +1,37 @@
+"""
+Builds the FastAPI app wired to the in-memory fakes instead of OpenAI, Qdrant and Postgres.
+"""
+
+from benchmarks.fakes import FakeDatabaseService, FakeRAGService
+from src.utils.chunking import chunk_text
+
+
+def create_benchmark_app(embedding_latency: float = 0.0, search_latency: float = 0.0, db_latency: float = 0.0):
+    """Import the app with the external services replaced and the textbook indexed into the fake store."""
+    import src.services.database as database_module
+    import src.services.rag_service as rag_module
+    from src.config import settings
+
+    FakeRAGService.embedding_latency = embedding_latency
+    FakeRAGService.search_latency = search_latency
+    FakeDatabaseService.latency = db_latency
+
+    # main.py instantiates the services at import time, so the classes are swapped first
+    database_module.DatabaseService = FakeDatabaseService
+    rag_module.RAGService = FakeRAGService
+    # A single benchmark client would otherwise hit the per-IP limit immediately
+    settings.rate_limit_requests = 10 ** 9
+    # Simulated users identify themselves with X-User-Id
+    settings.trust_user_id_header = True
+
+    from src.api.main import app, chapter_service, db_service, rag_service
+
+    for language in chapter_service.languages:
+        for chapter in chapter_service.get_language_chapters(language):
+            chunks = chunk_text(chapter.content)
+            rag_service.add_texts(
+                chunks,
+                [{"chapter_id": chapter.id, "language": language, "source": "textbook"} for _ in chunks],
+            )
+
+    return app, db_service
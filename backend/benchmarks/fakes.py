@@ -0,0 +1,101 @@
+"""
+In-memory stand-ins for the external services (OpenAI embeddings, Qdrant and
+Neon Postgres) so the API can be benchmarked offline. Optional artificial
+latencies model the network round-trips of the real services.
+"""
+
+import asyncio
+import time
+import zlib
+from typing import List, Optional
+
+import numpy as np
+
+from src.config import settings
+
+
+def fake_embedding(text: str, dimensions: int = 1536) -> np.ndarray:
+    """Deterministic unit vector derived from the text, standing in for an embedding API call."""
+    rng = np.random.default_rng(zlib.crc32(text.encode("utf-8")))
+    vector = rng.standard_normal(dimensions).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+class FakeRAGService:
+    """Drop-in for RAGService that keeps vectors in a numpy matrix and searches exhaustively."""
+
+    # Class-level knobs so they can be set before the app instantiates the service
+    embedding_latency = 0.0
+    search_latency = 0.0
+
+    def __init__(self, snapshots=None):
+        self.collection_name = "textbook_content"
+        self.vector_size = 1536
+        self.vectors = np.zeros((0, self.vector_size), dtype=np.float32)
+        self.payloads: List[dict] = []
+
+    def add_texts(self, texts: List[str], metadatas: Optional[List[dict]] = None, ids: Optional[List[str]] = None):
+        embeddings = np.stack([fake_embedding(text, self.vector_size) for text in texts])
+        self.vectors = np.vstack([self.vectors, embeddings])
+        for i, text in enumerate(texts):
+            self.payloads.append({"content": text, "language": settings.default_language, **(metadatas[i] if metadatas else {})})
+
+    def similarity_search(self, query: str, k: int = 4, filter=None, language: Optional[str] = None) -> List[dict]:
+        # The real service makes blocking HTTP calls here, so the fake blocks too
+        time.sleep(self.embedding_latency)
+        query_vector = fake_embedding(query, self.vector_size)
+        time.sleep(self.search_latency)
+
+        candidates = np.asarray(
+            [i for i, payload in enumerate(self.payloads) if not language or payload["language"] == language],
+            dtype=np.int64,
+        )
+        if len(candidates) == 0:
+            return []
+
+        scores = self.vectors[candidates] @ query_vector
+        top = np.argsort(-scores)[:k]
+        return [
+            {
+                "content": self.payloads[candidates[i]]["content"],
+                "score": float(scores[i]),
+                "metadata": {key: value for key, value in self.payloads[candidates[i]].items() if key != "content"},
+            }
+            for i in top
+        ]
+
+
+class FakeDatabaseService:
+    """Drop-in for DatabaseService that stores nothing and counts round-trips."""
+
+    latency = 0.0
+
+    def __init__(self):
+        self.round_trips = 0
+
+    async def connect(self):
+        pass
+
+    async def disconnect(self):
+        pass
+
+    async def _round_trip(self):
+        self.round_trips += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def execute_query(self, query: str, *args):
+        await self._round_trip()
+        return []
+
+    async def execute_query_row(self, query: str, *args):
+        await self._round_trip()
+        return None
+
+    async def execute_command(self, command: str, *args):
+        await self._round_trip()
+        return "OK"
+
+    async def execute_many(self, command: str, args_list: list):
+        if args_list:
+            await self._round_trip()
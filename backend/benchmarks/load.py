@@ -0,0 +1,134 @@
+"""
+Async load generator. Drives the API in-process through an ASGI transport, or a
+server on localhost when a base URL is given, with a weighted mix of reader traffic.
+"""
+
+import asyncio
+import random
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.stats import summarize
+
+# (endpoint label, relative weight)
+SCENARIO = [
+    ("GET /api/chapters", 2),
+    ("GET /api/chapters/{id}", 3),
+    ("POST /api/chat/query", 1),
+    ("GET /api/personalization/chapter/{id}", 3),
+    ("PATCH /api/personalization/chapter/{id}", 4),
+    ("GET /api/users/profile", 1),
+]
+
+CHAT_QUESTIONS = [
+    "What is Physical AI?",
+    "How do ROS 2 nodes communicate?",
+    "What is a digital twin used for?",
+    "How do vision-language-action models work?",
+    "What are the main components of a humanoid robot?",
+]
+
+
+def _build_request(endpoint: str, rng: random.Random, chapter_ids: List[str], user_id: str, sequence: int):
+    chapter_id = rng.choice(chapter_ids)
+    headers = {"X-User-Id": user_id}
+    if endpoint == "GET /api/chapters":
+        return "GET", "/api/chapters", None, headers
+    if endpoint == "GET /api/chapters/{id}":
+        return "GET", f"/api/chapters/{chapter_id}", None, headers
+    if endpoint == "POST /api/chat/query":
+        body = {
+            "query_id": f"{user_id}-{sequence}",
+            "session_id": f"session-{user_id}",
+            "query_text": rng.choice(CHAT_QUESTIONS),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "source_chapter_id": chapter_id,
+        }
+        return "POST", "/api/chat/query", body, headers
+    if endpoint == "GET /api/personalization/chapter/{id}":
+        return "GET", f"/api/personalization/chapter/{chapter_id}", None, headers
+    if endpoint == "PATCH /api/personalization/chapter/{id}":
+        start = rng.randrange(0, 5000)
+        body = {"addHighlights": [{"start": start, "end": start + rng.randrange(10, 200)}]}
+        return "PATCH", f"/api/personalization/chapter/{chapter_id}", body, headers
+    return "GET", "/api/users/profile", None, headers
+
+
+async def _worker(
+    client: httpx.AsyncClient,
+    worker_id: int,
+    users: int,
+    chapter_ids: List[str],
+    deadline: float,
+    remaining: List[int],
+    latencies: Dict[str, List[float]],
+    errors: Dict[str, int],
+    seed: int,
+):
+    rng = random.Random(seed + worker_id)
+    endpoints = [endpoint for endpoint, _ in SCENARIO]
+    weights = [weight for _, weight in SCENARIO]
+    sequence = 0
+
+    while time.perf_counter() < deadline and remaining[0] > 0:
+        remaining[0] -= 1
+        sequence += 1
+        endpoint = rng.choices(endpoints, weights)[0]
+        method, path, body, headers = _build_request(
+            endpoint, rng, chapter_ids, f"user-{rng.randrange(users)}", sequence
+        )
+
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, path, json=body, headers=headers)
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        latencies[endpoint].append(time.perf_counter() - started)
+        if not ok:
+            errors[endpoint] += 1
+
+
+async def run_load(
+    app=None,
+    base_url: Optional[str] = None,
+    requests: int = 5000,
+    duration: float = 60.0,
+    concurrency: int = 32,
+    users: int = 200,
+    seed: int = 0,
+) -> dict:
+    """Run the scenario until `requests` have been sent or `duration` seconds have passed."""
+    if base_url:
+        client = httpx.AsyncClient(base_url=base_url, timeout=30.0)
+    else:
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark", timeout=30.0)
+
+    async with client:
+        chapters = (await client.get("/api/chapters")).json()
+        chapter_ids = [chapter["id"] for chapter in chapters]
+
+        latencies: Dict[str, List[float]] = defaultdict(list)
+        errors: Dict[str, int] = defaultdict(int)
+        remaining = [requests]
+        started = time.perf_counter()
+        await asyncio.gather(*[
+            _worker(client, i, users, chapter_ids, started + duration, remaining, latencies, errors, seed)
+            for i in range(concurrency)
+        ])
+        elapsed = time.perf_counter() - started
+
+    endpoints = {}
+    for endpoint, _ in SCENARIO:
+        endpoints[endpoint] = {**summarize(latencies[endpoint], elapsed), "errors": errors[endpoint]}
+    all_latencies = [latency for values in latencies.values() for latency in values]
+    return {
+        "elapsed_sec": round(elapsed, 3),
+        "concurrency": concurrency,
+        "endpoints": endpoints,
+        "total": {**summarize(all_latencies, elapsed), "errors": sum(errors.values())},
+    }
@@ -0,0 +1,155 @@
+"""
+Microbenchmarks for hot code paths: the rate limiter, response serialization,
+vector top-k, chunking and the corpus snapshot.
+"""
+
+import asyncio
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Dict
+
+import numpy as np
+from starlette.requests import Request
+from starlette.responses import Response
+
+from src.config import settings
+from src.middleware.rate_limit import RateLimitMiddleware
+from src.models.chapter import TextbookChapter
+from src.models.personalization import Annotation, Bookmark, Highlight, PersonalizedChapterView
+from src.services.corpus_snapshot import CorpusSnapshot, publish_snapshot
+from src.utils.chunking import chunk_text, strip_front_matter
+from benchmarks.stats import summarize
+
+DOCS_DIR = Path(__file__).resolve().parents[2] / "docusaurus" / "docs"
+
+
+def _time_sync(func: Callable, iterations: int) -> dict:
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - t0)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+async def _time_async(func: Callable, iterations: int) -> dict:
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        await func()
+        latencies.append(time.perf_counter() - t0)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def _load_chapters():
+    paths = sorted(DOCS_DIR.glob("chapter-*/index.md"))
+    return [strip_front_matter(path.read_text(encoding="utf-8")) for path in paths]
+
+
+def bench_rate_limiter(iterations: int, clients: int = 1000) -> dict:
+    """Dispatch through RateLimitMiddleware with many clients whose windows are nearly full."""
+    middleware = RateLimitMiddleware(app=None)
+    now = time.time()
+    fill = max(settings.rate_limit_requests - 2, 0)
+    for client in range(clients):
+        middleware.requests[f"10.0.{client // 256}.{client % 256}"] = [now - i for i in range(fill)]
+
+    requests = [
+        Request({"type": "http", "method": "GET", "path": "/", "headers": [], "client": (f"10.0.{c // 256}.{c % 256}", 1234)})
+        for c in range(clients)
+    ]
+    response = Response()
+
+    async def call_next(request):
+        return response
+
+    counter = iter(range(iterations))
+
+    async def dispatch():
+        request = requests[next(counter) % clients]
+        await middleware.dispatch(request, call_next)
+        # Keep the window level so every iteration does the same amount of work
+        middleware.requests[request.client.host].pop()
+
+    return asyncio.run(_time_async(dispatch, iterations))
+
+
+def bench_serialization(iterations: int) -> Dict[str, dict]:
+    """JSON serialization of the chapter list and a busy personalization view."""
+    chapters = [
+        TextbookChapter(id=f"chapter-{i}", title=f"Chapter {i}", content=content, chapter_number=i)
+        for i, content in enumerate(_load_chapters(), start=1)
+    ]
+    view = PersonalizedChapterView(
+        userId="user-123",
+        chapterId="chapter-1",
+        bookmarks=[Bookmark(position=i * 100, label=f"Bookmark {i}") for i in range(50)],
+        highlights=[Highlight(start=i * 100, end=i * 100 + 40, note="note") for i in range(200)],
+        annotations=[Annotation(position=i * 100, content="An annotation " * 5) for i in range(50)],
+    )
+    return {
+        "serialize_chapters": _time_sync(lambda: [chapter.model_dump_json() for chapter in chapters], iterations),
+        "serialize_personalization": _time_sync(view.model_dump_json, iterations),
+        "validate_personalization": _time_sync(lambda: PersonalizedChapterView.model_validate_json(view.model_dump_json()), iterations),
+    }
+
+
+def bench_vector_top_k(iterations: int, vectors: int = 20000, dimensions: int = 1536, k: int = 10) -> dict:
+    """Exhaustive cosine top-k over an in-memory matrix, as used for re-ranking and local search."""
+    rng = np.random.default_rng(0)
+    matrix = rng.standard_normal((vectors, dimensions), dtype=np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    query = matrix[0]
+
+    def top_k():
+        scores = matrix @ query
+        candidates = np.argpartition(-scores, k)[:k]
+        return candidates[np.argsort(-scores[candidates])]
+
+    return _time_sync(top_k, iterations)
+
+
+def bench_chunking(iterations: int) -> dict:
+    """Chunk every textbook chapter."""
+    chapters = _load_chapters()
+    return _time_sync(lambda: [chunk_text(chapter) for chapter in chapters], iterations)
+
+
+def bench_snapshot(iterations: int, dimensions: int = 1536) -> Dict[str, dict]:
+    """Map a snapshot of the textbook, then read chapters and gather full vectors for re-ranking."""
+    contents = _load_chapters()
+    chapters = [
+        TextbookChapter(id=f"chapter-{i}", title=f"Chapter {i}", content=content, chapter_number=i)
+        for i, content in enumerate(contents, start=1)
+    ]
+    chunks = [(i, chunk) for i, content in enumerate(contents) for chunk in chunk_text(content)]
+    chunk_ids = [str(uuid.UUID(int=i)) for i in range(len(chunks))]
+    embeddings = np.random.default_rng(0).standard_normal((len(chunks), dimensions), dtype=np.float32)
+
+    with tempfile.TemporaryDirectory() as snapshot_dir:
+        path = publish_snapshot(snapshot_dir, chapters, chunks, embeddings, chunk_ids=chunk_ids)
+        snapshot = CorpusSnapshot(path)
+        # The candidates of one two-stage search with k=4 and the default re-rank factor
+        candidate_ids = chunk_ids[::max(len(chunk_ids) // (4 * settings.embedding_rerank_factor), 1)]
+
+        def gather_rerank_vectors():
+            return snapshot.embeddings[snapshot.embedding_rows(candidate_ids)]
+
+        return {
+            "snapshot_open": _time_sync(lambda: CorpusSnapshot(path), iterations),
+            "snapshot_chapter": _time_sync(lambda: snapshot.chapter(0), iterations),
+            "snapshot_rerank_vectors": _time_sync(gather_rerank_vectors, iterations),
+        }
+
+
+def run_microbenchmarks(iterations: int = 1000) -> Dict[str, dict]:
+    results = {"rate_limiter_dispatch": bench_rate_limiter(iterations)}
+    results.update(bench_serialization(iterations))
+    results["vector_top_k_20k"] = bench_vector_top_k(max(iterations // 10, 10))
+    results["chunk_chapters"] = bench_chunking(max(iterations // 10, 10))
+    results.update(bench_snapshot(iterations))
+    return results
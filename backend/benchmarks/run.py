@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Backend benchmark suite.
+Runs the microbenchmarks and the in-process load test against fake OpenAI,
+Qdrant and Postgres stand-ins, and writes the results as JSON so they can be
+compared between commits.
+
+    cd backend
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --output new.json --compare bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Run from the backend directory so `src` and `benchmarks` are importable
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+# Per-request INFO logging would dominate the measurements
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from benchmarks.load import run_load
+from benchmarks.micro import run_microbenchmarks
+
+COMPARED_METRICS = ("throughput_per_sec", "p50_ms", "p95_ms", "p99_ms")
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def _run_in_process_load(args) -> dict:
+    from benchmarks.app import create_benchmark_app
+
+    app, db_service = create_benchmark_app(
+        embedding_latency=args.embedding_latency_ms / 1000,
+        search_latency=args.search_latency_ms / 1000,
+        db_latency=args.db_latency_ms / 1000,
+    )
+    # The ASGI transport does not send lifespan events, so run startup/shutdown here
+    async with app.router.lifespan_context(app):
+        results = await run_load(
+            app=app,
+            requests=args.requests,
+            duration=args.duration,
+            concurrency=args.concurrency,
+            users=args.users,
+        )
+    results["db_round_trips"] = db_service.round_trips
+    return results
+
+
+def compare(baseline: dict, current: dict):
+    """Print the relative change of each latency/throughput metric against a baseline run."""
+    print(f"Comparing {current['meta']['commit']} against {baseline['meta']['commit']}")
+    sections = [("micro", baseline.get("micro", {}), current.get("micro", {}))]
+    if "load" in baseline and "load" in current:
+        sections.append(("load", baseline["load"]["endpoints"], current["load"]["endpoints"]))
+
+    for section, old_results, new_results in sections:
+        for name in sorted(set(old_results) & set(new_results)):
+            changes = []
+            for metric in COMPARED_METRICS:
+                old, new = old_results[name].get(metric), new_results[name].get(metric)
+                if old and new is not None:
+                    changes.append(f"{metric} {old} -> {new} ({(new - old) / old * 100:+.1f}%)")
+            print(f"  [{section}] {name}: " + ", ".join(changes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backend benchmark suite")
+    parser.add_argument("--skip-micro", action="store_true", help="Skip the microbenchmarks")
+    parser.add_argument("--skip-load", action="store_true", help="Skip the load test")
+    parser.add_argument("--iterations", type=int, default=1000, help="Microbenchmark iterations")
+    parser.add_argument("--requests", type=int, default=5000, help="Total load-test requests")
+    parser.add_argument("--duration", type=float, default=60.0, help="Load-test time limit in seconds")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent load-test clients")
+    parser.add_argument("--users", type=int, default=200, help="Distinct simulated users")
+    parser.add_argument("--base-url", help="Benchmark a running server instead of the in-process app")
+    parser.add_argument("--embedding-latency-ms", type=float, default=0.0, help="Simulated embedding API latency")
+    parser.add_argument("--search-latency-ms", type=float, default=0.0, help="Simulated Qdrant search latency")
+    parser.add_argument("--db-latency-ms", type=float, default=0.0, help="Simulated Postgres round-trip latency")
+    parser.add_argument("--output", type=Path, help="Write the JSON results to this file")
+    parser.add_argument("--compare", type=Path, help="Baseline JSON results to compare against")
+    args = parser.parse_args()
+
+    results = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": {key: str(value) if isinstance(value, Path) else value for key, value in vars(args).items()},
+        }
+    }
+
+    if not args.skip_micro:
+        print("Running microbenchmarks...", file=sys.stderr)
+        results["micro"] = run_microbenchmarks(args.iterations)
+
+    if not args.skip_load:
+        print("Running load test...", file=sys.stderr)
+        if args.base_url:
+            results["load"] = asyncio.run(run_load(
+                base_url=args.base_url,
+                requests=args.requests,
+                duration=args.duration,
+                concurrency=args.concurrency,
+                users=args.users,
+            ))
+        else:
+            results["load"] = asyncio.run(_run_in_process_load(args))
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        args.output.write_text(output)
+    else:
+        print(output)
+
+    if args.compare:
+        compare(json.loads(args.compare.read_text()), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Serves the benchmark app (fake OpenAI, Qdrant and Postgres) on localhost so the
+load generator can be pointed at a real HTTP server:
+
+    python -m benchmarks.serve --port 8001
+    python -m benchmarks.run --skip-micro --base-url http://127.0.0.1:8001
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+import uvicorn
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+# Per-request INFO logging would dominate the measurements
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from benchmarks.app import create_benchmark_app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the API backed by in-memory fakes")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--embedding-latency-ms", type=float, default=0.0)
+    parser.add_argument("--search-latency-ms", type=float, default=0.0)
+    parser.add_argument("--db-latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    app, _ = create_benchmark_app(
+        embedding_latency=args.embedding_latency_ms / 1000,
+        search_latency=args.search_latency_ms / 1000,
+        db_latency=args.db_latency_ms / 1000,
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+from typing import List
+
+import numpy as np
+
+
+def summarize(latencies: List[float], elapsed: float) -> dict:
+    """Summarize per-operation latencies (seconds) measured over `elapsed` wall-clock seconds."""
+    if not latencies:
+        return {"count": 0, "throughput_per_sec": 0.0, "p50_ms": None, "p95_ms": None, "p99_ms": None}
+    p50, p95, p99 = np.percentile(np.asarray(latencies) * 1000, [50, 95, 99])
+    return {
+        "count": len(latencies),
+        "throughput_per_sec": round(len(latencies) / elapsed, 2) if elapsed > 0 else None,
+        "p50_ms": round(float(p50), 4),
+        "p95_ms": round(float(p95), 4),
+        "p99_ms": round(float(p99), 4),
+    }
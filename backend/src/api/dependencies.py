@@ -0,0 +1,38 @@
+from fastapi import Header, HTTPException, Request
+from typing import Optional
+from src.config import settings
+from src.services.chapter_service import ChapterService
+from src.services.personalization_service import PersonalizationService
+from src.services.profile_service import ProfileService
+from src.services.rag_service import RAGService
+
+
+async def get_current_user_id(request: Request, x_user_id: Optional[str] = Header(None)) -> str:
+    """
+    Identify the calling user and record their activity.
+    In production this would come from the verified JWT; until auth is wired in
+    the frontend passes the user ID in the X-User-Id header. That header is not
+    verified, so per-user routes stay disabled unless TRUST_USER_ID_HEADER is set.
+    """
+    if not settings.trust_user_id_header:
+        raise HTTPException(status_code=403, detail="Per-user data is disabled until authentication is enabled")
+    if not x_user_id:
+        raise HTTPException(status_code=401, detail="User not authenticated")
+    request.app.state.profile_service.touch(x_user_id)
+    return x_user_id
+
+
+def get_personalization_service(request: Request) -> PersonalizationService:
+    return request.app.state.personalization_service
+
+
+def get_profile_service(request: Request) -> ProfileService:
+    return request.app.state.profile_service
+
+
+def get_chapter_service(request: Request) -> ChapterService:
+    return request.app.state.chapter_service
+
+
+def get_rag_service(request: Request) -> RAGService:
+    return request.app.state.rag_service
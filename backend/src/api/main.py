@@ -3,6 +3,11 @@ from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from src.services.database import DatabaseService
 from src.services.rag_service import RAGService
+from src.services.chapter_service import ChapterService
+from src.services.corpus_snapshot import SnapshotManager
+from src.config import settings
+from src.services.personalization_service import PersonalizationService
+from src.services.profile_service import ProfileService
 from src.middleware.rate_limit import RateLimitMiddleware
 import os
 import logging
@@ -13,7 +18,12 @@ logger = logging.getLogger(__name__)
 
 # Create global service instances
 db_service = DatabaseService()
-rag_service = RAGService()
+# One snapshot mapping per worker, shared by chapter reads and search re-ranking
+snapshots = SnapshotManager(settings.snapshot_dir) if settings.snapshot_dir else None
+rag_service = RAGService(snapshots=snapshots)
+chapter_service = ChapterService(snapshots=snapshots)
+personalization_service = PersonalizationService(db_service)
+profile_service = ProfileService(db_service)
 
 
 @asynccontextmanager
@@ -24,11 +34,23 @@ async def lifespan(app: FastAPI):
     await db_service.connect()
     logger.info("Database connection initialized.")
 
+    await personalization_service.init_schema()
+    personalization_service.start()
+    logger.info("Personalization service initialized.")
+
+    await profile_service.init_schema()
+    profile_service.start()
+    logger.info("Profile service initialized.")
+
     logger.info("RAG service initialized.")
 
     yield  # App runs here
 
     # Shutdown
+    logger.info("Flushing pending personalization and profile changes...")
+    await personalization_service.stop()
+    await profile_service.stop()
+
     logger.info("Closing database connection...")
     await db_service.disconnect()
     logger.info("Database connection closed.")
@@ -44,6 +66,11 @@ app = FastAPI(
     # docs_url=None, redoc_url=None  # Uncomment these in high-security environments
 )
 
+app.state.rag_service = rag_service
+app.state.chapter_service = chapter_service
+app.state.personalization_service = personalization_service
+app.state.profile_service = profile_service
+
 # Add rate limiting middleware first
 app.add_middleware(RateLimitMiddleware)
 
@@ -1,26 +1,66 @@
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, Depends, Header, Request
+from starlette.concurrency import run_in_threadpool
 from typing import Optional
+from datetime import datetime, timezone
 import logging
+from src.api.dependencies import get_chapter_service, get_profile_service, get_rag_service
 from src.models.chat import ChatQuery, ChatResponse
+from src.services.chapter_service import ChapterService
+from src.services.profile_service import ProfileService
+from src.services.rag_service import RAGService
 from src.config import settings
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 @router.post("/chat/query", response_model=ChatResponse)
-async def chat_query(request: Request, chat_query: ChatQuery):
+async def chat_query(
+    request: Request,
+    chat_query: ChatQuery,
+    x_user_id: Optional[str] = Header(None),
+    rag_service: RAGService = Depends(get_rag_service),
+    profile_service: ProfileService = Depends(get_profile_service),
+    chapter_service: ChapterService = Depends(get_chapter_service),
+):
     """
     Submit a question about the textbook content and receive an AI-generated 
     response based solely on textbook content.
+    Only the edition in the user's content language is searched, falling
+    back to the default language when that edition does not exist.
     """
-    # In production, this would connect to the RAG system
-    # For now, return a mock response
+    language = chat_query.language
+    # The header is unverified, so it only selects preferences when explicitly trusted
+    if not language and x_user_id and settings.trust_user_id_header:
+        language = (await profile_service.get_preferences(x_user_id))["language"]
+    # Like chapters, chat falls back to the default edition when there is no translation
+    if language not in chapter_service.languages:
+        language = settings.default_language
+
+    # Embedding and Qdrant calls are blocking, so keep them off the event loop
+    results = await run_in_threadpool(
+        rag_service.similarity_search, chat_query.query_text, 4, None, language
+    )
+
+    # In production the retrieved passages would be passed to the LLM;
+    # for now the best matching passage is returned as the answer
+    if results:
+        response_text = results[0]["content"]
+        confidence_score = max(0.0, min(1.0, results[0]["score"]))
+    else:
+        response_text = "No relevant textbook content was found for this question."
+        confidence_score = None
+    source_documents = list(dict.fromkeys(
+        result["metadata"]["chapter_id"] for result in results if "chapter_id" in result["metadata"]
+    ))
+
     response = ChatResponse(
         response_id=f"resp_{chat_query.query_id}",
         query_id=chat_query.query_id,
-        response_text="This is a mock response. In production, this would be generated by the RAG system based on textbook content.",
-        timestamp=chat_query.timestamp  # In real implementation, this would be current time
+        response_text=response_text,
+        timestamp=datetime.now(timezone.utc),
+        confidence_score=confidence_score,
+        source_documents=source_documents,
     )
     
-    logger.info(f"Chat query processed: {chat_query.query_text[:50]}...")
-    return response
\ No newline at end of file
+    logger.info(f"Chat query processed ({language}): {chat_query.query_text[:50]}...")
+    return response
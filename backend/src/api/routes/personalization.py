@@ -1,32 +1,51 @@
-from fastapi import APIRouter
-from src.models.personalization import PersonalizedChapterView
+from fastapi import APIRouter, Depends, HTTPException
+from src.api.dependencies import get_current_user_id, get_personalization_service
+from src.models.personalization import PersonalizationDelta, PersonalizedChapterView
+from src.services.personalization_service import PersonalizationService
 
 router = APIRouter()
 
-# Mock personalization for deployment
-MOCK_PERSONALIZATION = PersonalizedChapterView(
-    userId="user-123",
-    chapterId="chapter-1-intro-physical-ai",
-    bookmarks=[],
-    highlights=[],
-    annotations=[]
-)
 
 @router.get("/personalization/chapter/{chapter_id}", response_model=PersonalizedChapterView)
-async def get_personalization(chapter_id: str):
+async def get_personalization(
+    chapter_id: str,
+    user_id: str = Depends(get_current_user_id),
+    service: PersonalizationService = Depends(get_personalization_service),
+):
     """
     Retrieve personalization data for a specific chapter.
     """
-    # In production, this would fetch from database based on authenticated user
-    MOCK_PERSONALIZATION.chapterId = chapter_id
-    return MOCK_PERSONALIZATION
+    return await service.get_view(user_id, chapter_id)
 
 
 @router.post("/personalization/chapter/{chapter_id}", response_model=PersonalizedChapterView)
-async def update_personalization(chapter_id: str, personalization: PersonalizedChapterView):
+async def update_personalization(
+    chapter_id: str,
+    personalization: PersonalizedChapterView,
+    user_id: str = Depends(get_current_user_id),
+    service: PersonalizationService = Depends(get_personalization_service),
+):
     """
     Save personalization data for a specific chapter.
+    Replaces every stored bookmark, highlight and annotation of the chapter.
     """
-    # In production, this would save to database
-    personalization.chapterId = chapter_id
-    return personalization
\ No newline at end of file
+    try:
+        return await service.replace_view(user_id, chapter_id, personalization)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.patch("/personalization/chapter/{chapter_id}", response_model=PersonalizedChapterView)
+async def patch_personalization(
+    chapter_id: str,
+    delta: PersonalizationDelta,
+    user_id: str = Depends(get_current_user_id),
+    service: PersonalizationService = Depends(get_personalization_service),
+):
+    """
+    Add or remove individual bookmarks, highlights and annotations by ID.
+    """
+    try:
+        return await service.apply_delta(user_id, chapter_id, delta)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
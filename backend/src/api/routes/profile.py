@@ -1,30 +1,35 @@
-from fastapi import APIRouter
-from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException
+from src.api.dependencies import get_current_user_id, get_profile_service
 from src.models.user import UserProfile
+from src.services.profile_service import ProfileService, default_profile
 
 router = APIRouter()
 
-# Mock user profile for deployment
-MOCK_PROFILE = UserProfile(
-    user_id="user-123",
-    email="student@example.com",
-    preferences={"language": "en", "interfaceLanguage": "en"}
-)
 
 @router.get("/users/profile", response_model=UserProfile)
-async def get_profile():
+async def get_profile(
+    user_id: str = Depends(get_current_user_id),
+    service: ProfileService = Depends(get_profile_service),
+):
     """
     Retrieve the current user's profile information and preferences.
     """
-    # In production, this would fetch from database based on authentication
-    return MOCK_PROFILE
+    profile = await service.get(user_id)
+    return profile or default_profile(user_id)
 
 
 @router.put("/users/profile", response_model=UserProfile)
-async def update_profile(profile: UserProfile):
+async def update_profile(
+    profile: UserProfile,
+    user_id: str = Depends(get_current_user_id),
+    service: ProfileService = Depends(get_profile_service),
+):
     """
     Update the current user's profile information and preferences.
     """
-    # In production, this would update the database
-    # For now, just return the updated profile
-    return profile
\ No newline at end of file
+    # Users can only update their own profile
+    profile.user_id = user_id
+    try:
+        return await service.update(profile)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -10,6 +10,46 @@ class Settings(BaseSettings):
     neon_database_url: Optional[str] = None
     rate_limit_requests: int = 100
     rate_limit_window: int = 3600  # in seconds
+    # Per-user routes trust the unverified X-User-Id header; keep off in production until JWT auth lands
+    trust_user_id_header: bool = False
+
+    # Qdrant Collection Configuration
+    qdrant_quantization: str = "none"  # none, scalar, binary
+    qdrant_quantization_always_ram: bool = True
+    qdrant_vectors_on_disk: bool = False  # keep original vectors on disk, quantized copy in RAM
+    qdrant_payload_on_disk: bool = False
+    qdrant_hnsw_m: int = 16
+    qdrant_hnsw_ef_construct: int = 100
+    qdrant_hnsw_payload_m: Optional[int] = None  # extra per-language graph links for filtered search
+    qdrant_search_ef: Optional[int] = None  # None lets Qdrant pick ef from the limit
+    qdrant_rescore: bool = True
+    qdrant_oversampling: float = 2.0
+
+    # Embedding Configuration
+    embedding_model: str = "text-embedding-ada-002"
+    embedding_dimensions: Optional[int] = None  # reduced size for the search vector, None keeps the model size
+    embedding_reduction: str = "truncate"  # truncate (Matryoshka, text-embedding-3-* only) or pca
+    embedding_pca_path: Optional[str] = None  # .npz written by scripts/eval_embedding_dimensions.py
+    embedding_rerank_full: bool = True  # store full vectors and re-rank reduced-vector candidates with them
+    embedding_rerank_factor: int = 4  # candidates fetched per requested result
+
+    # Personalization Configuration
+    personalization_flush_interval: float = 2.0  # seconds between batched writes
+    personalization_cache_users: int = 1000  # users kept in the per-worker LRU cache
+    personalization_cache_ttl: int = 60  # seconds before a cached view is re-read
+
+    # Profile Configuration
+    profile_cache_ttl: int = 300  # seconds a cached profile is served without a database read
+    profile_cache_size: int = 10000  # profiles kept in the per-worker cache
+    profile_flush_interval: float = 30.0  # seconds between batched last_active writes
+    profile_sync_interval: float = 2.0  # seconds between checks for profiles updated by other workers
+
+    # Content Configuration
+    content_dir: Optional[str] = None  # Docusaurus site root, defaults to the repository's docusaurus/
+    default_language: str = "en"
+    snapshot_dir: Optional[str] = None  # shared corpus snapshots; unset serves chapters from markdown
+    snapshot_poll_interval: float = 5.0  # seconds between checks for a newly published snapshot
+    snapshot_keep: int = 2  # snapshot versions kept on disk
 
     # Application Configuration
     environment: str = "development"
@@ -1,6 +1,7 @@
 from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime
+from src.config import settings
 
 
 class TextbookChapter(BaseModel):
@@ -8,7 +9,7 @@ class TextbookChapter(BaseModel):
     title: str
     content: str
     chapter_number: int
-    language: str = "en"
+    language: str = settings.default_language
     created_date: Optional[datetime] = None
     updated_date: Optional[datetime] = None
     status: str = "Published"  # Draft, Published, Archived
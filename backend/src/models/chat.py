@@ -9,6 +9,7 @@ class ChatQuery(BaseModel):
     query_text: str
     timestamp: datetime
     source_chapter_id: Optional[str] = None
+    language: Optional[str] = None  # defaults to the user's preferred content language
     
     class Config:
         json_schema_extra = {
@@ -17,7 +18,8 @@ class ChatQuery(BaseModel):
                 "session_id": "session-abc123",
                 "query_text": "What is the main principle of Physical AI?",
                 "timestamp": "2023-10-01T10:05:00Z",
-                "source_chapter_id": "chapter-1-intro-physical-ai"
+                "source_chapter_id": "chapter-1-intro-physical-ai",
+                "language": "en"
             }
         }
 
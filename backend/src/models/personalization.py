@@ -0,0 +1,65 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List
+from datetime import datetime
+from uuid import uuid4
+
+
+def _new_item_id() -> str:
+    return uuid4().hex
+
+
+class Bookmark(BaseModel):
+    id: str = Field(default_factory=_new_item_id)
+    position: int
+    label: Optional[str] = None
+
+
+class Highlight(BaseModel):
+    id: str = Field(default_factory=_new_item_id)
+    start: int
+    end: int
+    note: Optional[str] = None
+
+
+class Annotation(BaseModel):
+    id: str = Field(default_factory=_new_item_id)
+    position: int
+    content: str
+
+
+class PersonalizedChapterView(BaseModel):
+    userId: str
+    chapterId: str
+    bookmarks: List[Bookmark] = []
+    highlights: List[Highlight] = []
+    annotations: List[Annotation] = []
+    lastViewed: Optional[datetime] = None
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "userId": "user-123",
+                "chapterId": "chapter-1-intro-physical-ai",
+                "bookmarks": [{"id": "b1", "position": 120, "label": "Definition"}],
+                "highlights": [{"id": "h1", "start": 200, "end": 260, "note": "Key idea"}],
+                "annotations": [{"id": "a1", "position": 480, "content": "Compare with chapter 3"}]
+            }
+        }
+
+
+class PersonalizationDelta(BaseModel):
+    """Incremental change to a chapter view; items are matched by ID, and adding an existing ID replaces it."""
+    addBookmarks: List[Bookmark] = []
+    removeBookmarks: List[str] = []
+    addHighlights: List[Highlight] = []
+    removeHighlights: List[str] = []
+    addAnnotations: List[Annotation] = []
+    removeAnnotations: List[str] = []
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "addHighlights": [{"start": 300, "end": 340}],
+                "removeBookmarks": ["b1"]
+            }
+        }
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Collection configuration benchmark.
+This script loads a synthetic corpus into a scratch Qdrant collection once per
+configuration and reports the measured and estimated RAM per vector, recall@10
+against exact search and search latency percentiles, so Qdrant nodes can be sized.
+
+RAM is measured as the growth of Qdrant's resident memory from the empty
+collection to the indexed and searched one. It is read from Qdrant's /metrics
+endpoint or, with --qdrant-pid, from /proc for a Qdrant process on this host.
+The estimate only counts vectors, quantized copies and level-0 HNSW links.
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+import urllib.request
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+
+# Add the backend/src directory to the path so we can import our modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.services.rag_service import build_collection_params, build_search_params
+from src.config import settings
+
+BENCHMARK_COLLECTION = "benchmark_collection"
+TOP_K = 10
+
+# Setting overrides for each configuration under test
+CONFIGURATIONS: Dict[str, dict] = {
+    "float32": {"qdrant_quantization": "none", "qdrant_vectors_on_disk": False},
+    "scalar-ram": {"qdrant_quantization": "scalar", "qdrant_vectors_on_disk": False},
+    "scalar-disk": {"qdrant_quantization": "scalar", "qdrant_vectors_on_disk": True},
+    "binary-disk": {"qdrant_quantization": "binary", "qdrant_vectors_on_disk": True, "qdrant_oversampling": 3.0},
+    "scalar-disk-m8": {"qdrant_quantization": "scalar", "qdrant_vectors_on_disk": True, "qdrant_hnsw_m": 8},
+}
+
+
+def estimate_ram_per_vector(config, dim: int) -> int:
+    """
+    Estimate resident bytes per vector: originals, quantized copy and level-0 HNSW links.
+
+    Payload, payload indexes, the id tracker and upper HNSW layers are left out, so
+    this is a lower bound to compare with the measured figure.
+
+    `dim` is the search vector size. With two-stage search the full re-rank vector
+    is on disk, unquantized and unindexed, so it adds nothing resident.
+    """
+    total = 0 if config.qdrant_vectors_on_disk else dim * 4
+    quantization = config.qdrant_quantization.lower()
+    if config.qdrant_quantization_always_ram:
+        if quantization == "scalar":
+            total += dim
+        elif quantization == "binary":
+            total += math.ceil(dim / 8)
+    # Level-0 graph keeps up to 2*m neighbour ids of 4 bytes each
+    total += config.qdrant_hnsw_m * 2 * 4
+    return total
+
+
+# Prometheus gauges with Qdrant's resident memory, preferred first
+RESIDENT_MEMORY_METRICS = ("memory_resident_bytes", "process_resident_memory_bytes")
+
+
+def metrics_resident_memory() -> Optional[int]:
+    """Read Qdrant's resident memory from its Prometheus metrics, if it exports it."""
+    url = f"http://{settings.qdrant_host}:{settings.qdrant_port}/metrics"
+    with urllib.request.urlopen(url, timeout=10) as response:
+        lines = response.read().decode("utf-8").splitlines()
+    values = {}
+    for line in lines:
+        name, _, value = line.partition(" ")
+        if name in RESIDENT_MEMORY_METRICS:
+            values[name] = int(float(value))
+    return next((values[name] for name in RESIDENT_MEMORY_METRICS if name in values), None)
+
+
+def process_resident_memory(pid: int) -> int:
+    """Read a local process's resident memory from /proc."""
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    raise ValueError(f"No VmRSS for process {pid}")
+
+
+def make_corpus(num_vectors: int, num_queries: int, dim: int, seed: int):
+    """Generate clustered, normalized vectors that resemble text embeddings."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(num_vectors // 100, 1), dim))
+    vectors = centers[rng.integers(len(centers), size=num_vectors)] + 0.5 * rng.normal(size=(num_vectors, dim))
+    queries = centers[rng.integers(len(centers), size=num_queries)] + 0.5 * rng.normal(size=(num_queries, dim))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    return vectors.astype(np.float32), queries.astype(np.float32)
+
+
+def exact_top_k(vectors: np.ndarray, queries: np.ndarray, k: int) -> List[set]:
+    """Brute-force cosine top-k used as ground truth."""
+    scores = queries @ vectors.T
+    return [set(row) for row in np.argsort(-scores, axis=1)[:, :k].tolist()]
+
+
+def wait_until_indexed(client: QdrantClient, timeout: float = 600.0):
+    """Block until the optimizer has finished building the index."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if client.get_collection(BENCHMARK_COLLECTION).status == models.CollectionStatus.GREEN:
+            return
+        time.sleep(1)
+    raise TimeoutError("Collection was not indexed in time")
+
+
+def run_configuration(
+    client: QdrantClient,
+    name: str,
+    overrides: dict,
+    vectors,
+    queries,
+    truth,
+    batch_size: int,
+    resident_memory: Optional[Callable[[], Optional[int]]] = None,
+) -> dict:
+    """Load the corpus with one configuration and measure it."""
+    config = settings.model_copy(update=overrides)
+
+    try:
+        client.delete_collection(BENCHMARK_COLLECTION)
+    except:
+        pass
+    client.create_collection(
+        collection_name=BENCHMARK_COLLECTION,
+        optimizers_config=models.OptimizersConfigDiff(indexing_threshold=1000),
+        **build_collection_params(config, vector_size=vectors.shape[1]),
+    )
+    baseline = resident_memory() if resident_memory else None
+    for start in range(0, len(vectors), batch_size):
+        batch = vectors[start:start + batch_size]
+        client.upsert(
+            collection_name=BENCHMARK_COLLECTION,
+            points=models.Batch(ids=list(range(start, start + len(batch))), vectors=batch.tolist()),
+        )
+    wait_until_indexed(client)
+
+    search_params = build_search_params(config)
+    latencies = []
+    hits = 0
+    for query, expected in zip(queries, truth):
+        started = time.perf_counter()
+        results = client.search(
+            collection_name=BENCHMARK_COLLECTION,
+            query_vector=query.tolist(),
+            limit=TOP_K,
+            search_params=search_params,
+        )
+        latencies.append((time.perf_counter() - started) * 1000)
+        hits += len(expected & {result.id for result in results})
+
+    # Measured after searching, so on-disk data that searches page in is counted
+    measured = None
+    if baseline is not None:
+        resident = resident_memory()
+        if resident is not None:
+            measured = round((resident - baseline) / len(vectors))
+
+    client.delete_collection(BENCHMARK_COLLECTION)
+    return {
+        "configuration": name,
+        "measured_ram_bytes_per_vector": measured,
+        "estimated_ram_bytes_per_vector": estimate_ram_per_vector(config, vectors.shape[1]),
+        "recall_at_10": round(hits / (len(queries) * TOP_K), 4),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--vectors", type=int, default=20000, help="Number of corpus vectors")
+    parser.add_argument("--queries", type=int, default=200, help="Number of search queries")
+    parser.add_argument("--dim", type=int, default=1536, help="Vector dimension")
+    parser.add_argument("--batch-size", type=int, default=512, help="Upsert batch size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument("--qdrant-pid", type=int, help="Measure RAM from /proc for a Qdrant process on this host")
+    args = parser.parse_args()
+
+    if args.qdrant_pid:
+        resident_memory = lambda: process_resident_memory(args.qdrant_pid)
+    elif metrics_resident_memory() is not None:
+        resident_memory = metrics_resident_memory
+    else:
+        resident_memory = None
+        print("Qdrant does not export resident memory; pass --qdrant-pid to measure RAM", file=sys.stderr)
+
+    client = QdrantClient(host=settings.qdrant_host, port=settings.qdrant_port)
+    vectors, queries = make_corpus(args.vectors, args.queries, args.dim, args.seed)
+    truth = exact_top_k(vectors, queries, TOP_K)
+
+    results = []
+    for name, overrides in CONFIGURATIONS.items():
+        print(f"Benchmarking {name}...", file=sys.stderr)
+        results.append(run_configuration(
+            client, name, overrides, vectors, queries, truth, args.batch_size, resident_memory
+        ))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'configuration':<16}{'measured B/vec':>16}{'estimated B/vec':>17}{'recall@10':>12}{'p50 ms':>10}{'p99 ms':>10}")
+    for result in results:
+        measured = result["measured_ram_bytes_per_vector"]
+        print(
+            f"{result['configuration']:<16}{'n/a' if measured is None else measured:>16}"
+            f"{result['estimated_ram_bytes_per_vector']:>17}"
+            f"{result['recall_at_10']:>12}{result['p50_ms']:>10}{result['p99_ms']:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Corpus snapshot builder.
+This script writes chapters, chunk texts, metadata and (optionally) embeddings into a
+single versioned memory-mapped file and publishes it, so every uvicorn worker maps
+the same corpus instead of loading its own copy. The indexer publishes a snapshot
+automatically when SNAPSHOT_DIR is set; use this script to rebuild one without
+re-indexing Qdrant.
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+# Add the backend/src directory to the path so we can import our modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.services.chapter_service import ChapterService
+from src.services.corpus_snapshot import CorpusSnapshot, publish_snapshot
+from src.utils.chunking import chunk_id, chunk_text
+from src.config import settings
+
+
+def build_snapshot(snapshot_dir: str, embed: bool):
+    """Build a snapshot from the markdown content and publish it."""
+    chapter_service = ChapterService()
+    chapters = []
+    chunks = []
+    chunk_ids = []
+    for language in chapter_service.languages:
+        for chapter in chapter_service.get_language_chapters(language):
+            chapters.append(chapter)
+            for i, chunk in enumerate(chunk_text(chapter.content)):
+                chunks.append((len(chapters) - 1, chunk))
+                chunk_ids.append(chunk_id(language, chapter.id, i))
+
+    embeddings = None
+    if embed:
+        from src.services.embedding_service import EmbeddingService
+        print(f"Embedding {len(chunks)} chunks...")
+        embeddings = np.asarray(EmbeddingService().embed_texts([chunk for _, chunk in chunks]), dtype=np.float32)
+
+    path = publish_snapshot(
+        snapshot_dir, chapters, chunks, embeddings,
+        chunk_ids=chunk_ids, embedding_model=settings.embedding_model,
+    )
+    snapshot = CorpusSnapshot(path)
+    print(
+        f"Published snapshot {snapshot.version}: {len(chapters)} chapters, {len(chunks)} chunks, "
+        f"languages {', '.join(snapshot.chapter_index)}, {os.path.getsize(path)} bytes"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build and publish a corpus snapshot")
+    parser.add_argument("--dir", default=settings.snapshot_dir, help="Snapshot directory (default: SNAPSHOT_DIR)")
+    parser.add_argument("--embed", action="store_true", help="Include embeddings (requires OPENAI_API_KEY)")
+    args = parser.parse_args()
+    if not args.dir:
+        parser.error("--dir or SNAPSHOT_DIR is required")
+    build_snapshot(args.dir, args.embed)
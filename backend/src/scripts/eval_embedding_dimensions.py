@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Offline evaluation of recall versus embedding dimension.
+This script embeds the textbook chunks and section headings (used as queries) once,
+then measures how well truncated and PCA-reduced vectors reproduce the full-vector
+top-10, both on their own and with full-vector re-ranking of the candidates.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+# Add the backend/src directory to the path so we can import our modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.services.embedding_service import (
+    TRUNCATABLE_EMBEDDING_MODELS,
+    EmbeddingReducer,
+    EmbeddingService,
+    fit_pca,
+)
+from src.utils.chunking import chunk_text, strip_front_matter
+from src.config import settings
+
+TOP_K = 10
+DEFAULT_DOCS_DIR = Path(__file__).resolve().parents[3] / "docusaurus" / "docs"
+HEADING = re.compile(r"^#{2,3}\s+(.+)$", re.MULTILINE)
+
+
+def load_corpus(docs_dir: Path):
+    """Chunk every chapter and collect its section headings as queries."""
+    chunks, queries = [], []
+    for path in sorted(docs_dir.glob("chapter-*/index.md")):
+        text = strip_front_matter(path.read_text(encoding="utf-8"))
+        chunks.extend(chunk_text(text))
+        queries.extend(HEADING.findall(text))
+    return chunks, queries
+
+
+def load_embeddings(chunks: List[str], queries: List[str], cache_path: Path):
+    """Embed chunks and queries, reusing a cached .npz when the inputs match."""
+    if cache_path.exists():
+        cached = np.load(cache_path)
+        if len(cached["chunks"]) == len(chunks) and len(cached["queries"]) == len(queries):
+            return cached["chunks"], cached["queries"]
+
+    service = EmbeddingService()
+    chunk_vectors = np.asarray(service.embed_texts(chunks), dtype=np.float32)
+    query_vectors = np.asarray(service.embed_texts(queries), dtype=np.float32)
+    np.savez(cache_path, chunks=chunk_vectors, queries=query_vectors)
+    return chunk_vectors, query_vectors
+
+
+def top_k(corpus: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """Cosine top-k indices for each query (inputs are unit-normalized)."""
+    return np.argsort(-(queries @ corpus.T), axis=1)[:, :k]
+
+
+def recall(found: np.ndarray, expected: np.ndarray) -> float:
+    hits = sum(len(set(a) & set(b)) for a, b in zip(found.tolist(), expected.tolist()))
+    return hits / expected.size
+
+
+def rerank(candidates: np.ndarray, corpus: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """Re-rank reduced-vector candidates with full-vector cosine."""
+    reranked = []
+    for query, row in zip(queries, candidates):
+        scores = corpus[row] @ query
+        reranked.append(row[np.argsort(-scores)[:k]])
+    return np.asarray(reranked)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs-dir", type=Path, default=DEFAULT_DOCS_DIR, help="Docusaurus docs directory")
+    parser.add_argument("--dims", type=int, nargs="+", default=[64, 128, 256, 512, 768, 1024])
+    parser.add_argument("--rerank-factor", type=int, default=settings.embedding_rerank_factor)
+    parser.add_argument("--cache", type=Path, default=Path(f"embeddings_{settings.embedding_model}.npz"))
+    parser.add_argument("--save-pca", type=int, metavar="DIM", help="Write a PCA projection of this size for EMBEDDING_PCA_PATH")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    chunks, queries = load_corpus(args.docs_dir)
+    corpus, query_vectors = load_embeddings(chunks, queries, args.cache)
+    k = min(TOP_K, len(corpus))
+    expected = top_k(corpus, query_vectors, k)
+    full_dim = corpus.shape[1]
+
+    results = []
+    # PCA is fitted on the evaluated corpus, so its recall is an upper bound for unseen text
+    projection = fit_pca(corpus, min(max(args.dims), *corpus.shape))
+    for method in ("truncate", "pca"):
+        for dims in args.dims:
+            if dims >= full_dim or (method == "pca" and dims > len(projection[1])):
+                continue
+            reducer = EmbeddingReducer(dims, method=method, projection=projection)
+            short_corpus = reducer.reduce_array(corpus)
+            short_queries = reducer.reduce_array(query_vectors)
+            candidates = top_k(short_corpus, short_queries, min(k * args.rerank_factor, len(corpus)))
+            results.append({
+                "method": method,
+                "dimensions": dims,
+                "bytes_per_vector": dims * 4,
+                "recall_at_10": round(recall(candidates[:, :k], expected), 4),
+                "recall_at_10_reranked": round(recall(rerank(candidates, corpus, query_vectors, k), expected), 4),
+            })
+
+    if args.save_pca:
+        mean, components = fit_pca(corpus, args.save_pca)
+        np.savez(f"pca_{args.save_pca}.npz", mean=mean, components=components)
+        print(f"Wrote pca_{args.save_pca}.npz (fitted on {len(corpus)} chunks)", file=sys.stderr)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{len(chunks)} chunks, {len(queries)} queries, full dimension {full_dim} ({full_dim * 4} bytes)")
+    if settings.embedding_model not in TRUNCATABLE_EMBEDDING_MODELS:
+        print(f"{settings.embedding_model} is not Matryoshka-trained: truncate rows are for comparison only")
+    print(f"{'method':<10}{'dims':>6}{'bytes':>8}{'recall@10':>12}{'reranked':>10}")
+    for result in results:
+        print(
+            f"{result['method']:<10}{result['dimensions']:>6}{result['bytes_per_vector']:>8}"
+            f"{result['recall_at_10']:>12}{result['recall_at_10_reranked']:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,9 @@
 #!/usr/bin/env python3
 """
 Content indexing script for initial textbook chapters.
-This script reads the textbook content and indexes it in Qdrant for RAG operations.
+This script reads the textbook content of every edition and indexes it in Qdrant for RAG operations.
+Content is indexed into a fresh versioned collection that replaces the live one once complete,
+so chunks of shrunk, renamed or removed chapters do not linger.
 """
 
 import asyncio
@@ -9,72 +11,74 @@ import os
 import sys
 from pathlib import Path
 
+import numpy as np
+
 # Add the backend/src directory to the path so we can import our modules
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from src.services.rag_service import RAGService
+from src.services.chapter_service import ChapterService
+from src.services.corpus_snapshot import publish_snapshot
+from src.utils.chunking import chunk_id, chunk_text
 from src.config import settings
 
 
 async def index_textbook_content():
-    """Index all textbook content into the RAG system."""
+    """Index all textbook content into the RAG system, partitioned by language."""
     print("Starting textbook content indexing...")
     
     # Initialize RAG service
-    rag_service = RAGService()
+    rag_service = RAGService(check_layout=False)
+    chapter_service = ChapterService()
+    collection_name = rag_service.begin_rebuild()
     
-    # For this initial implementation, we'll simulate indexing
-    # In a real implementation, we would read from actual textbook files
-    textbook_content = [
-        {
-            "id": "chapter-1-intro-physical-ai",
-            "title": "Introduction to Physical AI",
-            "content": "# Introduction to Physical AI\n\nPhysical AI is a field that combines physical systems with artificial intelligence. It focuses on creating intelligent systems that can interact with the physical world in a meaningful way. This chapter introduces the fundamental concepts and principles of Physical AI."
-        },
-        {
-            "id": "chapter-2-basics-humanoid",
-            "title": "Basics of Humanoid Robotics",
-            "content": "# Basics of Humanoid Robotics\n\nHumanoid robotics is a branch of robotics focused on creating robots with human-like characteristics. This chapter covers the basic principles of humanoid design, kinematics, and control systems."
-        },
-        {
-            "id": "chapter-3-ros-fundamentals",
-            "title": "ROS 2 Fundamentals",
-            "content": "# ROS 2 Fundamentals\n\nROS 2 (Robot Operating System 2) is a flexible framework for writing robot software. This chapter covers the basics of ROS 2 including nodes, topics, services, and actions."
-        },
-        {
-            "id": "chapter-4-digital-twin",
-            "title": "Digital Twin Simulation (Gazebo + Isaac)",
-            "content": "# Digital Twin Simulation\n\nDigital twin technology allows creating virtual replicas of physical systems. This chapter explores simulation using Gazebo and Isaac for robotics applications."
-        },
-        {
-            "id": "chapter-5-vla-systems",
-            "title": "Vision-Language-Action Systems",
-            "content": "# Vision-Language-Action Systems\n\nVision-Language-Action (VLA) systems integrate visual perception, language understanding, and physical action. This chapter covers how these systems work together in robotics applications."
-        },
-        {
-            "id": "chapter-6-capstone",
-            "title": "Capstone: Simple AI-Robot Pipeline",
-            "content": "# Capstone: Simple AI-Robot Pipeline\n\nThis capstone chapter brings together all concepts learned to build a simple AI-robot pipeline, demonstrating the integration of perception, decision-making, and action."
-        }
-    ]
+    # Everything indexed is also collected for the shared corpus snapshot
+    snapshot_chapters = []
+    snapshot_chunks = []
+    snapshot_ids = []
+    snapshot_embeddings = []
     
-    # Extract text content and prepare metadata for each chapter
-    texts = []
-    metadatas = []
-    ids = []
+    for language in chapter_service.languages:
+        # Extract chunked text content and prepare metadata for each chapter in this edition
+        texts = []
+        metadatas = []
+        ids = []
+        
+        chapters = chapter_service.get_language_chapters(language)
+        for chapter in chapters:
+            snapshot_chapters.append(chapter)
+            for i, chunk in enumerate(chunk_text(chapter.content)):
+                snapshot_chunks.append((len(snapshot_chapters) - 1, chunk))
+                texts.append(chunk)
+                metadatas.append({
+                    "title": chapter.title,
+                    "chapter_id": chapter.id,
+                    "language": language,
+                    "chunk_index": i,
+                    "source": "textbook"
+                })
+                ids.append(chunk_id(language, chapter.id, i))
+        
+        # Add the content to the RAG service
+        print(f"Indexing {len(chapters)} chapters ({len(texts)} chunks) for language '{language}'...")
+        embeddings = rag_service.add_texts(texts, metadatas, ids, collection_name=collection_name)
+        # Kept as float32 for the snapshot rather than as lists of Python floats
+        snapshot_embeddings.append(np.asarray(embeddings, dtype=np.float32).reshape(len(texts), -1))
+        snapshot_ids.extend(ids)
     
-    for chapter in textbook_content:
-        texts.append(chapter["content"])
-        metadatas.append({
-            "title": chapter["title"],
-            "chapter_id": chapter["id"],
-            "source": "textbook"
-        })
-        ids.append(chapter["id"])
+    rag_service.finish_rebuild(collection_name)
+    print(f"Collection '{rag_service.collection_name}' now points at '{collection_name}'")
     
-    # Add the content to the RAG service
-    print(f"Indexing {len(texts)} chapters...")
-    rag_service.add_texts(texts, metadatas, ids)
+    if settings.snapshot_dir:
+        path = publish_snapshot(
+            settings.snapshot_dir,
+            snapshot_chapters,
+            snapshot_chunks,
+            np.concatenate(snapshot_embeddings),
+            chunk_ids=snapshot_ids,
+            embedding_model=settings.embedding_model,
+        )
+        print(f"Published corpus snapshot {path}")
     
     print("Textbook content indexing completed successfully!")
 
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Collection migration script.
+This script rebuilds the existing Qdrant collection so that it picks up the current
+quantization, HNSW and on-disk settings from the environment.
+"""
+
+import os
+import sys
+
+# Add the backend/src directory to the path so we can import our modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.services.rag_service import RAGService
+from src.config import settings
+
+
+def migrate_collection():
+    """Rebuild the textbook collection with the configured collection settings."""
+    print("Starting collection migration...")
+    print(
+        f"Quantization: {settings.qdrant_quantization}, "
+        f"vectors on disk: {settings.qdrant_vectors_on_disk}, "
+        f"HNSW m={settings.qdrant_hnsw_m} ef_construct={settings.qdrant_hnsw_ef_construct}, "
+        f"payload on disk: {settings.qdrant_payload_on_disk}"
+    )
+
+    rag_service = RAGService(check_layout=False)
+    copied = rag_service.rebuild_collection()
+
+    print(f"Collection '{rag_service.collection_name}' rebuilt with {copied} points.")
+
+
+if __name__ == "__main__":
+    migrate_collection()
@@ -0,0 +1,138 @@
+import logging
+import re
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from src.config import settings
+from src.models.chapter import TextbookChapter
+from src.services.corpus_snapshot import SnapshotManager
+from src.utils.chunking import strip_front_matter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONTENT_DIR = Path(__file__).resolve().parents[3] / "docusaurus"
+# Docusaurus keeps translated docs under i18n/<locale>/docusaurus-plugin-content-docs/current
+TRANSLATED_DOCS = Path("docusaurus-plugin-content-docs") / "current"
+FRONT_MATTER_FIELD = re.compile(r"^(\w+):\s*(.+?)\s*$", re.MULTILINE)
+CHAPTER_NUMBER = re.compile(r"^chapter-(\d+)")
+
+# Served when the Docusaurus content is not deployed alongside the backend
+FALLBACK_CHAPTERS = [
+    TextbookChapter(
+        id="chapter-1-intro-physical-ai",
+        title="Introduction to Physical AI",
+        content="# Introduction to Physical AI\n\nPhysical AI is a field that combines physical systems with artificial intelligence...",
+        chapter_number=1
+    ),
+    TextbookChapter(
+        id="chapter-2-basics-humanoid",
+        title="Basics of Humanoid Robotics",
+        content="# Basics of Humanoid Robotics\n\nHumanoid robotics is a branch of robotics focused on creating robots with human-like characteristics...",
+        chapter_number=2
+    )
+]
+
+
+def _parse_chapter(path: Path, language: str) -> TextbookChapter:
+    text = path.read_text(encoding="utf-8")
+    front_matter = {}
+    if text.startswith("---\n"):
+        front_matter = dict(FRONT_MATTER_FIELD.findall(text.split("\n---\n", 1)[0]))
+
+    chapter_id = path.parent.name
+    number = front_matter.get("sidebar_position") or CHAPTER_NUMBER.match(chapter_id).group(1)
+    return TextbookChapter(
+        id=chapter_id,
+        title=front_matter.get("title", chapter_id),
+        content=strip_front_matter(text),
+        chapter_number=int(number),
+        language=language,
+    )
+
+
+class ChapterService:
+    """
+    Chapters of every edition, partitioned by language.
+
+    English chapters come from `docs/`, translations from the Docusaurus i18n
+    tree. A chapter without a translation falls back to the default language
+    copy, which callers can tell apart by its `language` field.
+
+    With a snapshot manager, chapters are read from the shared memory-mapped
+    corpus snapshot instead, and markdown is only loaded until one is published.
+    """
+
+    def __init__(
+        self,
+        content_dir: Optional[str] = settings.content_dir,
+        snapshots: Optional[SnapshotManager] = None,
+    ):
+        self.content_dir = Path(content_dir) if content_dir else DEFAULT_CONTENT_DIR
+        self.default_language = settings.default_language
+        self.snapshots = snapshots
+        self.chapters: Dict[str, Dict[str, TextbookChapter]] = {}
+        if snapshots is None or snapshots.current() is None:
+            self.load()
+
+    def _language_dirs(self) -> Dict[str, Path]:
+        dirs = {self.default_language: self.content_dir / "docs"}
+        i18n_dir = self.content_dir / "i18n"
+        if i18n_dir.is_dir():
+            for locale_dir in sorted(i18n_dir.iterdir()):
+                docs_dir = locale_dir / TRANSLATED_DOCS
+                if locale_dir.name != self.default_language and docs_dir.is_dir():
+                    dirs[locale_dir.name] = docs_dir
+        return dirs
+
+    def load(self):
+        """(Re)load all chapters from the content directory."""
+        chapters: Dict[str, Dict[str, TextbookChapter]] = {}
+        for language, docs_dir in self._language_dirs().items():
+            paths = sorted(docs_dir.glob("chapter-*/index.md"))
+            if paths:
+                parsed = [_parse_chapter(path, language) for path in paths]
+                chapters[language] = {
+                    chapter.id: chapter for chapter in sorted(parsed, key=lambda chapter: chapter.chapter_number)
+                }
+
+        if self.default_language not in chapters:
+            logger.warning(f"No chapters found in {self.content_dir}, serving built-in chapters")
+            chapters[self.default_language] = {chapter.id: chapter for chapter in FALLBACK_CHAPTERS}
+
+        self.chapters = chapters
+
+    def _index(self) -> Tuple[Dict[str, Dict[str, object]], Callable[[object], TextbookChapter]]:
+        """Return the language -> chapter ID index in use and how to resolve its entries."""
+        snapshot = self.snapshots.current() if self.snapshots else None
+        if snapshot is not None:
+            # Release the markdown copy loaded before the first snapshot was published
+            self.chapters = {}
+            return snapshot.chapter_index, snapshot.chapter
+        if not self.chapters:
+            self.load()
+        return self.chapters, lambda chapter: chapter
+
+    @property
+    def languages(self) -> List[str]:
+        index, _ = self._index()
+        return list(index)
+
+    def get_chapters(self, language: str) -> List[TextbookChapter]:
+        """All chapters in the requested language, with untranslated ones in the default language."""
+        index, resolve = self._index()
+        translated = index.get(language, {})
+        return [
+            resolve(translated.get(chapter_id, entry))
+            for chapter_id, entry in index[self.default_language].items()
+        ]
+
+    def get_chapter(self, chapter_id: str, language: str) -> Optional[TextbookChapter]:
+        index, resolve = self._index()
+        entry = index.get(language, {}).get(chapter_id)
+        if entry is None:
+            entry = index[self.default_language].get(chapter_id)
+        return resolve(entry) if entry is not None else None
+
+    def get_language_chapters(self, language: str) -> List[TextbookChapter]:
+        """Only the chapters actually written in `language`, e.g. for indexing."""
+        index, resolve = self._index()
+        return [resolve(entry) for entry in index.get(language, {}).values()]
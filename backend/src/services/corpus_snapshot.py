@@ -0,0 +1,269 @@
+import json
+import logging
+import math
+import mmap
+import os
+import struct
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from src.config import settings
+from src.models.chapter import TextbookChapter
+
+logger = logging.getLogger(__name__)
+
+# File layout:
+#   preamble  magic, format version, header length
+#   header    UTF-8 JSON: snapshot version, chapter metadata and the section table
+#   sections  64-byte aligned contiguous buffers: the UTF-8 text blob, chunk offsets,
+#             chunk -> chapter indices, and optionally the chunks' Qdrant point IDs
+#             with their float32 full-size embedding matrix
+MAGIC = b"CORPSNAP"
+FORMAT_VERSION = 1
+PREAMBLE = struct.Struct("<8sIQ")
+ALIGNMENT = 64
+CURRENT_POINTER = "CURRENT"
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def write_snapshot(
+    path: Path,
+    version: str,
+    chapters: List[TextbookChapter],
+    chunks: List[Tuple[int, str]],
+    embeddings: Optional[np.ndarray] = None,
+    chunk_ids: Optional[List[str]] = None,
+    embedding_model: Optional[str] = None,
+):
+    """
+    Write a snapshot file.
+
+    `chunks` are (chapter index, chunk text) pairs. `embeddings`, when given,
+    holds one row per chunk in the same order, keyed by the chunks' Qdrant point
+    `chunk_ids` and produced by `embedding_model`.
+    """
+    text = bytearray()
+
+    def add_text(value: str) -> List[int]:
+        encoded = value.encode("utf-8")
+        offset = len(text)
+        text.extend(encoded)
+        return [offset, len(encoded)]
+
+    chapter_meta = [
+        {
+            "id": chapter.id,
+            "title": chapter.title,
+            "chapter_number": chapter.chapter_number,
+            "language": chapter.language,
+            "status": chapter.status,
+            "content": add_text(chapter.content),
+        }
+        for chapter in chapters
+    ]
+    arrays = {
+        "chunk_offsets": np.asarray([add_text(chunk) for _, chunk in chunks], dtype=np.int64).reshape(-1, 2),
+        "chunk_chapters": np.asarray([chapter for chapter, _ in chunks], dtype=np.int32),
+    }
+    arrays["text"] = np.frombuffer(bytes(text), dtype=np.uint8)
+    if embeddings is not None:
+        if len(embeddings) != len(chunks) or chunk_ids is None or len(chunk_ids) != len(chunks):
+            raise ValueError("Expected one embedding and one point ID per chunk")
+        arrays["embeddings"] = np.ascontiguousarray(embeddings, dtype=np.float32)
+        arrays["chunk_ids"] = np.frombuffer(
+            b"".join(uuid.UUID(chunk_id).bytes for chunk_id in chunk_ids), dtype=np.uint8
+        ).reshape(-1, 16)
+
+    sections = {}
+    offset = 0
+    for name, array in arrays.items():
+        sections[name] = {"offset": offset, "dtype": array.dtype.str, "shape": list(array.shape)}
+        offset = _align(offset + array.nbytes)
+
+    header = json.dumps({
+        "version": version,
+        "created": datetime.now(timezone.utc).isoformat(),
+        "embedding_model": embedding_model,
+        "chapters": chapter_meta,
+        "sections": sections,
+    }).encode("utf-8")
+    data_start = _align(PREAMBLE.size + len(header))
+
+    with open(path, "wb") as f:
+        f.write(PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header)))
+        f.write(header)
+        for name, array in arrays.items():
+            f.seek(data_start + sections[name]["offset"])
+            f.write(array.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def publish_snapshot(
+    snapshot_dir: str,
+    chapters: List[TextbookChapter],
+    chunks: List[Tuple[int, str]],
+    embeddings: Optional[np.ndarray] = None,
+    chunk_ids: Optional[List[str]] = None,
+    embedding_model: Optional[str] = None,
+    keep: int = settings.snapshot_keep,
+) -> Path:
+    """
+    Write a new snapshot version and atomically point CURRENT at it.
+
+    Workers still mapping an older version keep reading it until they swap;
+    removing the file only drops its directory entry, not their mapping.
+    """
+    if keep < 1:
+        raise ValueError("keep must be at least 1 so the published snapshot is retained")
+    # Untranslated chapters fall back to the default language, so it must always be present
+    if not any(chapter.language == settings.default_language for chapter in chapters):
+        raise ValueError(f"Snapshot has no chapters in the default language '{settings.default_language}'")
+
+    directory = Path(snapshot_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    version = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    name = f"corpus-{version}.snap"
+
+    staging = directory / f".{name}.tmp"
+    write_snapshot(staging, version, chapters, chunks, embeddings, chunk_ids, embedding_model)
+    os.replace(staging, directory / name)
+
+    pointer = directory / f".{CURRENT_POINTER}.tmp"
+    with open(pointer, "w") as f:
+        f.write(name)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(pointer, directory / CURRENT_POINTER)
+
+    for old in sorted(directory.glob("corpus-*.snap"))[:-keep]:
+        old.unlink()
+    return directory / name
+
+
+class CorpusSnapshot:
+    """
+    Read-only, memory-mapped view of a snapshot file.
+
+    Arrays are numpy views straight onto the mapping and strings are decoded
+    on access, so the corpus lives in the shared page cache rather than in
+    each worker's heap. Only the chapter metadata is parsed into Python objects.
+    The embedding matrix serves the full vectors for two-stage re-ranking.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, format_version, header_length = PREAMBLE.unpack_from(self._mmap, 0)
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            raise ValueError(f"{self.path} is not a format {FORMAT_VERSION} corpus snapshot")
+        header = json.loads(self._mmap[PREAMBLE.size:PREAMBLE.size + header_length])
+        data_start = _align(PREAMBLE.size + header_length)
+
+        self.version = header["version"]
+        self.embedding_model = header.get("embedding_model")
+        self._chapters = header["chapters"]
+        self._arrays: Dict[str, np.ndarray] = {}
+        for name, section in header["sections"].items():
+            dtype = np.dtype(section["dtype"])
+            count = math.prod(section["shape"])
+            array = np.frombuffer(self._mmap, dtype=dtype, count=count, offset=data_start + section["offset"]) if count else np.empty(0, dtype=dtype)
+            self._arrays[name] = array.reshape(section["shape"])
+
+        self._text = self._arrays["text"]
+        self.chunk_offsets = self._arrays["chunk_offsets"]
+        self.chunk_chapters = self._arrays["chunk_chapters"]
+        self.embeddings = self._arrays.get("embeddings")
+        self.chunk_ids = self._arrays.get("chunk_ids")
+        self._rows_by_id: Optional[Dict[str, int]] = None
+
+        # Small per-worker indexes over the chapter metadata
+        self.chapter_index: Dict[str, Dict[str, int]] = {}
+        order = sorted(range(len(self._chapters)), key=lambda i: self._chapters[i]["chapter_number"])
+        for i in order:
+            meta = self._chapters[i]
+            self.chapter_index.setdefault(meta["language"], {})[meta["id"]] = i
+
+    def _string(self, offset: int, length: int) -> str:
+        return self._text[offset:offset + length].tobytes().decode("utf-8")
+
+    def chapter(self, index: int) -> TextbookChapter:
+        meta = self._chapters[index]
+        return TextbookChapter(
+            id=meta["id"],
+            title=meta["title"],
+            content=self._string(*meta["content"]),
+            chapter_number=meta["chapter_number"],
+            language=meta["language"],
+            status=meta["status"],
+        )
+
+    def chunk(self, index: int) -> dict:
+        meta = self._chapters[self.chunk_chapters[index]]
+        return {
+            "content": self._string(*self.chunk_offsets[index]),
+            "metadata": {"chapter_id": meta["id"], "title": meta["title"], "language": meta["language"]},
+        }
+
+    def embedding_rows(self, point_ids: List) -> List[Optional[int]]:
+        """Rows of `embeddings` for Qdrant point IDs, or None for points this snapshot does not hold."""
+        if self.chunk_ids is None:
+            return [None] * len(point_ids)
+        if self._rows_by_id is None:
+            # Built on first use; the IDs themselves stay in the mapping
+            self._rows_by_id = {str(uuid.UUID(bytes=row.tobytes())): i for i, row in enumerate(self.chunk_ids)}
+        return [self._rows_by_id.get(str(point_id)) for point_id in point_ids]
+
+class SnapshotManager:
+    """
+    Tracks the published snapshot in a directory and hot-swaps to new versions.
+
+    The CURRENT pointer is re-read at most every `poll_interval` seconds. A new
+    version is mapped before it replaces the old one, so readers always see a
+    complete snapshot; the old mapping is released once nothing references it.
+    """
+
+    def __init__(self, snapshot_dir: str, poll_interval: float = settings.snapshot_poll_interval):
+        self.snapshot_dir = Path(snapshot_dir)
+        self.poll_interval = poll_interval
+        self._snapshot: Optional[CorpusSnapshot] = None
+        self._name: Optional[str] = None
+        self._checked_at = float("-inf")
+
+    def current(self) -> Optional[CorpusSnapshot]:
+        now = time.monotonic()
+        if now - self._checked_at >= self.poll_interval:
+            self._checked_at = now
+            self._refresh()
+        return self._snapshot
+
+    def _refresh(self):
+        try:
+            name = (self.snapshot_dir / CURRENT_POINTER).read_text().strip()
+        except FileNotFoundError:
+            return
+        if name == self._name:
+            return
+
+        try:
+            snapshot = CorpusSnapshot(self.snapshot_dir / name)
+        except (OSError, ValueError):
+            logger.error(f"Failed to open corpus snapshot {name}, keeping the current one", exc_info=True)
+            return
+        if settings.default_language not in snapshot.chapter_index:
+            logger.error(
+                f"Corpus snapshot {name} has no '{settings.default_language}' chapters, keeping the current one"
+            )
+            return
+
+        self._snapshot, self._name = snapshot, name
+        logger.info(f"Serving corpus snapshot {snapshot.version}")
@@ -51,4 +51,12 @@ class DatabaseService:
     async def execute_command(self, command: str, *args):
         """Execute a command (INSERT, UPDATE, DELETE) and return affected rows."""
         async with self.get_connection() as conn:
-            return await conn.execute(command, *args)
\ No newline at end of file
+            return await conn.execute(command, *args)
+    
+    async def execute_many(self, command: str, args_list: list):
+        """Execute a command once per argument tuple in a single round-trip and transaction."""
+        if not args_list:
+            return
+        async with self.get_connection() as conn:
+            async with conn.transaction():
+                await conn.executemany(command, args_list)
\ No newline at end of file
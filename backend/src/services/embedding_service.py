@@ -1,6 +1,103 @@
 from langchain.embeddings import OpenAIEmbeddings
-from typing import List
+from typing import List, Optional, Tuple
+import numpy as np
 import os
+from src.config import settings
+
+
+# Output dimension of each supported OpenAI embedding model
+EMBEDDING_MODEL_DIMENSIONS = {
+    "text-embedding-ada-002": 1536,
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+}
+
+# Models trained with Matryoshka representation learning, whose leading dimensions can be
+# truncated with little recall loss; other models need a PCA projection instead
+TRUNCATABLE_EMBEDDING_MODELS = {"text-embedding-3-small", "text-embedding-3-large"}
+
+
+def get_embedding_dimension(model: str) -> int:
+    """Return the native vector size of an embedding model."""
+    if model not in EMBEDDING_MODEL_DIMENSIONS:
+        raise ValueError(f"Unknown embedding model: {model}")
+    return EMBEDDING_MODEL_DIMENSIONS[model]
+
+
+def fit_pca(vectors: np.ndarray, dimensions: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Fit a PCA projection on embeddings, returning (mean, components)."""
+    mean = vectors.mean(axis=0)
+    _, _, vt = np.linalg.svd(vectors - mean, full_matrices=False)
+    return mean.astype(np.float32), vt[:dimensions].astype(np.float32)
+
+
+def load_pca_projection(path: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Load a (mean, components) projection saved with `np.savez`."""
+    projection = np.load(path)
+    return projection["mean"], projection["components"]
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+class EmbeddingReducer:
+    """Reduce full-size embeddings to a shorter search vector."""
+
+    def __init__(
+        self,
+        dimensions: int,
+        method: str = "truncate",
+        projection: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+    ):
+        self.dimensions = dimensions
+        self.method = method
+        self.mean = None
+        self.components = None
+
+        if method == "pca":
+            if projection is None:
+                raise ValueError("A PCA projection is required when EMBEDDING_REDUCTION is pca")
+            self.mean, components = projection
+            self.components = components[:dimensions]
+            if len(self.components) < dimensions:
+                raise ValueError(f"PCA projection has fewer than {dimensions} components")
+        elif method != "truncate":
+            raise ValueError(f"Unsupported EMBEDDING_REDUCTION value: {method}")
+
+    def reduce_array(self, vectors: np.ndarray) -> np.ndarray:
+        """Reduce a (n, full_dim) or (full_dim,) array and re-normalize for cosine search."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.method == "pca":
+            reduced = (vectors - self.mean) @ self.components.T
+        else:
+            # Matryoshka-trained models keep most information in the leading dimensions
+            reduced = vectors[..., :self.dimensions]
+        return _normalize(reduced)
+
+    def reduce(self, vector: List[float]) -> List[float]:
+        """Reduce a single embedding."""
+        return self.reduce_array(np.asarray(vector)).tolist()
+
+
+def get_embedding_reducer() -> Optional[EmbeddingReducer]:
+    """Build the reducer configured in settings, or None when full vectors are searched."""
+    full_size = get_embedding_dimension(settings.embedding_model)
+    if not settings.embedding_dimensions or settings.embedding_dimensions >= full_size:
+        return None
+    method = settings.embedding_reduction.lower()
+    if method == "truncate" and settings.embedding_model not in TRUNCATABLE_EMBEDDING_MODELS:
+        raise ValueError(
+            f"{settings.embedding_model} is not Matryoshka-trained, so truncating it degrades recall; "
+            "use EMBEDDING_REDUCTION=pca with a projection from src.scripts.eval_embedding_dimensions"
+        )
+    projection = None
+    if method == "pca":
+        if not settings.embedding_pca_path:
+            raise ValueError("EMBEDDING_PCA_PATH is required when EMBEDDING_REDUCTION is pca")
+        projection = load_pca_projection(settings.embedding_pca_path)
+    return EmbeddingReducer(settings.embedding_dimensions, method=method, projection=projection)
 
 
 class EmbeddingService:
@@ -10,7 +107,7 @@ class EmbeddingService:
         if not os.getenv("OPENAI_API_KEY"):
             raise ValueError("OPENAI_API_KEY environment variable is required")
         
-        self.embeddings = OpenAIEmbeddings()
+        self.embeddings = OpenAIEmbeddings(model=settings.embedding_model)
     
     def embed_text(self, text: str) -> List[float]:
         """Generate embedding for a single text."""
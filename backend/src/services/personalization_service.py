@@ -0,0 +1,350 @@
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from contextlib import suppress
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set, Tuple
+from src.config import settings
+from src.models.personalization import (
+    Annotation,
+    Bookmark,
+    Highlight,
+    PersonalizationDelta,
+    PersonalizedChapterView,
+)
+from src.services.database import DatabaseService
+
+logger = logging.getLogger(__name__)
+
+# Each bookmark, highlight and annotation is its own row, so a change rewrites only that item
+CREATE_TABLE = """
+CREATE TABLE IF NOT EXISTS personalization_items (
+    user_id TEXT NOT NULL,
+    chapter_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    item_key TEXT NOT NULL,
+    data JSONB NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (user_id, chapter_id, kind, item_key)
+)
+"""
+
+CREATE_VIEWS_TABLE = """
+CREATE TABLE IF NOT EXISTS chapter_views (
+    user_id TEXT NOT NULL,
+    chapter_id TEXT NOT NULL,
+    last_viewed TIMESTAMPTZ NOT NULL,
+    PRIMARY KEY (user_id, chapter_id)
+)
+"""
+
+# Items and the last view time are read in one round trip; the view time comes back as a VIEW_KIND row
+VIEW_KIND = "view"
+SELECT_ITEMS = """
+SELECT kind, item_key, data, updated_at FROM personalization_items
+WHERE user_id = $1 AND chapter_id = $2
+UNION ALL
+SELECT 'view', '', '{}'::jsonb, last_viewed FROM chapter_views
+WHERE user_id = $1 AND chapter_id = $2
+"""
+
+# Only move last_viewed forward, so out-of-order flushes from several workers are harmless
+UPSERT_VIEW = """
+INSERT INTO chapter_views (user_id, chapter_id, last_viewed)
+VALUES ($1, $2, $3)
+ON CONFLICT (user_id, chapter_id)
+DO UPDATE SET last_viewed = GREATEST(chapter_views.last_viewed, EXCLUDED.last_viewed)
+"""
+
+UPSERT_ITEM = """
+INSERT INTO personalization_items (user_id, chapter_id, kind, item_key, data, updated_at)
+VALUES ($1, $2, $3, $4, $5::jsonb, $6)
+ON CONFLICT (user_id, chapter_id, kind, item_key)
+DO UPDATE SET data = EXCLUDED.data, updated_at = EXCLUDED.updated_at
+"""
+
+DELETE_ITEM = """
+DELETE FROM personalization_items
+WHERE user_id = $1 AND chapter_id = $2 AND kind = $3 AND item_key = $4
+"""
+
+# Replacing a view drops every stored item not in the kept set, whatever this worker has cached
+DELETE_UNKEPT_ITEMS = """
+DELETE FROM personalization_items
+WHERE user_id = $1 AND chapter_id = $2 AND NOT (kind || ':' || item_key = ANY($3::text[]))
+"""
+
+ITEM_MODELS = {"bookmark": Bookmark, "highlight": Highlight, "annotation": Annotation}
+
+# (kind, item_key) -> item data, or None for a pending delete
+ItemChanges = Dict[Tuple[str, str], Optional[dict]]
+
+
+def _keyed_items(kind: str, entries: List) -> Dict[Tuple[str, str], dict]:
+    """Key items by their ID, rejecting duplicates rather than silently keeping the last one."""
+    items = {}
+    for entry in entries:
+        key = (kind, entry.id)
+        if key in items:
+            raise ValueError(f"Duplicate {kind} id '{entry.id}'")
+        items[key] = entry.model_dump()
+    return items
+
+
+def _view_items(view: PersonalizedChapterView) -> Dict[Tuple[str, str], dict]:
+    items = {}
+    for kind, entries in (
+        ("bookmark", view.bookmarks),
+        ("highlight", view.highlights),
+        ("annotation", view.annotations),
+    ):
+        items.update(_keyed_items(kind, entries))
+    return items
+
+
+def _delta_changes(delta: PersonalizationDelta) -> ItemChanges:
+    """Turn a delta into item changes; removals come first so re-adding an item in the same delta wins."""
+    changes: ItemChanges = {}
+    for kind, item_ids in (
+        ("bookmark", delta.removeBookmarks),
+        ("highlight", delta.removeHighlights),
+        ("annotation", delta.removeAnnotations),
+    ):
+        for item_id in item_ids:
+            changes[(kind, item_id)] = None
+    for kind, entries in (
+        ("bookmark", delta.addBookmarks),
+        ("highlight", delta.addHighlights),
+        ("annotation", delta.addAnnotations),
+    ):
+        changes.update(_keyed_items(kind, entries))
+    return changes
+
+
+class _CachedView:
+    __slots__ = ("items", "last_viewed", "loaded_at")
+
+    def __init__(self, items: Dict[Tuple[str, str], dict], last_viewed: Optional[datetime]):
+        self.items = items
+        self.last_viewed = last_viewed
+        self.loaded_at = time.monotonic()
+
+
+class PersonalizationService:
+    """
+    Postgres-backed store for bookmarks, highlights and annotations.
+
+    Writes are applied to the cached view immediately and coalesced per
+    (user, chapter) into a pending buffer that is flushed in one batch every
+    `flush_interval` seconds, so a burst of saves becomes a single upsert per
+    changed item. Reads are served from a per-worker LRU of users; entries expire
+    after `cache_ttl` seconds so changes flushed by other workers become visible.
+    Views are recorded in memory like `last_active` and written with the same flush.
+    """
+
+    def __init__(
+        self,
+        db: DatabaseService,
+        flush_interval: float = settings.personalization_flush_interval,
+        cache_users: int = settings.personalization_cache_users,
+        cache_ttl: int = settings.personalization_cache_ttl,
+    ):
+        self.db = db
+        self.flush_interval = flush_interval
+        self.cache_users = cache_users
+        self.cache_ttl = cache_ttl
+        self._cache: "OrderedDict[str, Dict[str, _CachedView]]" = OrderedDict()
+        self._pending: Dict[Tuple[str, str], ItemChanges] = {}
+        # Views whose pending changes are a full replacement of the stored items
+        self._pending_replaced: Set[Tuple[str, str]] = set()
+        # The batch being written, kept visible to reads until it commits
+        self._flushing: Dict[Tuple[str, str], ItemChanges] = {}
+        self._flushing_replaced: Set[Tuple[str, str]] = set()
+        self._viewed: Dict[Tuple[str, str], datetime] = {}
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+
+    async def init_schema(self):
+        """Create the personalization tables if they do not exist."""
+        await self.db.execute_command(CREATE_TABLE)
+        await self.db.execute_command(CREATE_VIEWS_TABLE)
+
+    def start(self):
+        """Start the background flush loop."""
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        """Stop the flush loop and write out anything still pending."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._flush_task
+            self._flush_task = None
+        await self.flush()
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def flush(self):
+        """Write all pending item changes and views in one batch."""
+        async with self._flush_lock:
+            if not self._pending and not self._viewed:
+                return
+            viewed, self._viewed = self._viewed, {}
+            self._flushing, self._pending = self._pending, {}
+            self._flushing_replaced, self._pending_replaced = self._pending_replaced, set()
+
+            now = datetime.now(timezone.utc)
+            upserts, deletes, replaces = [], [], []
+            for (user_id, chapter_id), changes in self._flushing.items():
+                for (kind, item_key), data in changes.items():
+                    if data is None:
+                        deletes.append((user_id, chapter_id, kind, item_key))
+                    else:
+                        upserts.append((user_id, chapter_id, kind, item_key, json.dumps(data), now))
+                if (user_id, chapter_id) in self._flushing_replaced:
+                    kept = [f"{kind}:{item_key}" for (kind, item_key), data in changes.items() if data is not None]
+                    replaces.append((user_id, chapter_id, kept))
+
+            try:
+                await self.db.execute_many(UPSERT_ITEM, upserts)
+                await self.db.execute_many(DELETE_ITEM, deletes)
+                await self.db.execute_many(DELETE_UNKEPT_ITEMS, replaces)
+                await self.db.execute_many(UPSERT_VIEW, [(*view_key, at) for view_key, at in viewed.items()])
+            except Exception:
+                logger.error("Failed to flush personalization changes, will retry", exc_info=True)
+                for view_key, at in viewed.items():
+                    self._viewed.setdefault(view_key, at)
+                # Re-queue, letting changes made during the flush override the failed ones
+                for view_key, changes in self._flushing.items():
+                    if view_key in self._pending_replaced:
+                        # Replaced again during the flush, which supersedes the failed changes
+                        continue
+                    changes.update(self._pending.get(view_key, {}))
+                    self._pending[view_key] = changes
+                    if view_key in self._flushing_replaced:
+                        self._pending_replaced.add(view_key)
+            finally:
+                self._flushing, self._flushing_replaced = {}, set()
+
+    def _cache_get(self, user_id: str, chapter_id: str) -> Optional[_CachedView]:
+        chapters = self._cache.get(user_id)
+        if chapters is None:
+            return None
+        self._cache.move_to_end(user_id)
+
+        entry = chapters.get(chapter_id)
+        if entry is None:
+            return None
+        # Entries with pending or in-flight changes are newer than the database, so they never expire
+        view_key = (user_id, chapter_id)
+        expired = time.monotonic() - entry.loaded_at > self.cache_ttl
+        if expired and view_key not in self._pending and view_key not in self._flushing:
+            return None
+        return entry
+
+    def _cache_put(self, user_id: str, chapter_id: str, entry: _CachedView):
+        self._cache.setdefault(user_id, {})[chapter_id] = entry
+        self._cache.move_to_end(user_id)
+        while len(self._cache) > self.cache_users:
+            self._cache.popitem(last=False)
+
+    async def _get_entry(self, user_id: str, chapter_id: str) -> _CachedView:
+        entry = self._cache_get(user_id, chapter_id)
+        if entry is not None:
+            return entry
+
+        rows = await self.db.execute_query(SELECT_ITEMS, user_id, chapter_id)
+
+        # Another request may have loaded the view while we were waiting
+        entry = self._cache_get(user_id, chapter_id)
+        if entry is not None:
+            return entry
+
+        items = {}
+        last_viewed = self._viewed.get((user_id, chapter_id))
+        for row in rows:
+            if row["kind"] == VIEW_KIND:
+                last_viewed = max(filter(None, (last_viewed, row["updated_at"])))
+                continue
+            data = json.loads(row["data"])
+            # Items saved before they had IDs were keyed by position (or start:end), which becomes their ID
+            data.setdefault("id", row["item_key"])
+            items[(row["kind"], row["item_key"])] = data
+        entry = _CachedView(items, last_viewed)
+        # Overlay changes that are being flushed or buffered but not yet committed
+        view_key = (user_id, chapter_id)
+        for changes, replaced in (
+            (self._flushing, self._flushing_replaced),
+            (self._pending, self._pending_replaced),
+        ):
+            if view_key in changes:
+                self._apply(entry, changes[view_key], replace=view_key in replaced)
+        self._cache_put(user_id, chapter_id, entry)
+        return entry
+
+    @staticmethod
+    def _apply(entry: _CachedView, changes: ItemChanges, replace: bool = False):
+        if replace:
+            entry.items = {}
+        for item, data in changes.items():
+            if data is None:
+                entry.items.pop(item, None)
+            else:
+                entry.items[item] = data
+
+    def _record(self, user_id: str, chapter_id: str, entry: _CachedView, changes: ItemChanges):
+        """Apply changes to the cached view and queue them for the next flush."""
+        if not changes:
+            return
+        self._apply(entry, changes)
+        self._pending.setdefault((user_id, chapter_id), {}).update(changes)
+
+    @staticmethod
+    def _to_view(user_id: str, chapter_id: str, entry: _CachedView) -> PersonalizedChapterView:
+        grouped = {kind: [] for kind in ITEM_MODELS}
+        for (kind, _), data in entry.items.items():
+            grouped[kind].append(ITEM_MODELS[kind](**data))
+        return PersonalizedChapterView(
+            userId=user_id,
+            chapterId=chapter_id,
+            bookmarks=sorted(grouped["bookmark"], key=lambda item: (item.position, item.id)),
+            highlights=sorted(grouped["highlight"], key=lambda item: (item.start, item.end, item.id)),
+            annotations=sorted(grouped["annotation"], key=lambda item: (item.position, item.id)),
+            lastViewed=entry.last_viewed,
+        )
+
+    async def get_view(self, user_id: str, chapter_id: str) -> PersonalizedChapterView:
+        """Return the user's personalization for a chapter and record the view."""
+        entry = await self._get_entry(user_id, chapter_id)
+        entry.last_viewed = self._viewed[(user_id, chapter_id)] = datetime.now(timezone.utc)
+        return self._to_view(user_id, chapter_id, entry)
+
+    async def apply_delta(self, user_id: str, chapter_id: str, delta: PersonalizationDelta) -> PersonalizedChapterView:
+        """Add or remove individual items. Raises ValueError on duplicate item IDs."""
+        changes = _delta_changes(delta)
+        entry = await self._get_entry(user_id, chapter_id)
+        self._record(user_id, chapter_id, entry, changes)
+        return self._to_view(user_id, chapter_id, entry)
+
+    async def replace_view(self, user_id: str, chapter_id: str, view: PersonalizedChapterView) -> PersonalizedChapterView:
+        """
+        Replace the whole view.
+
+        This worker's cache may predate items flushed by other workers, so the
+        replacement is not diffed against it: the flush writes the posted items and
+        deletes every other stored item of the chapter. Raises ValueError on
+        duplicate item IDs.
+        """
+        items = _view_items(view)
+        entry = await self._get_entry(user_id, chapter_id)
+        view_key = (user_id, chapter_id)
+        self._pending[view_key] = items
+        self._pending_replaced.add(view_key)
+        self._apply(entry, items, replace=True)
+        return self._to_view(user_id, chapter_id, entry)
@@ -0,0 +1,266 @@
+import asyncio
+import asyncpg
+import json
+import logging
+import time
+from collections import OrderedDict
+from contextlib import suppress
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Optional, Tuple
+from src.config import settings
+from src.models.user import UserProfile
+from src.services.database import DatabaseService
+
+logger = logging.getLogger(__name__)
+
+CREATE_TABLE = """
+CREATE TABLE IF NOT EXISTS user_profiles (
+    user_id TEXT PRIMARY KEY,
+    email TEXT UNIQUE,
+    preferences JSONB NOT NULL DEFAULT '{}'::jsonb,
+    created_date TIMESTAMPTZ NOT NULL DEFAULT now(),
+    last_active TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+)
+"""
+
+# Tables created before cross-worker invalidation lack updated_at
+ADD_UPDATED_AT = """
+ALTER TABLE user_profiles ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+"""
+
+CREATE_UPDATED_AT_INDEX = """
+CREATE INDEX IF NOT EXISTS user_profiles_updated_at ON user_profiles (updated_at)
+"""
+
+SELECT_PROFILES = """
+SELECT user_id, email, preferences, created_date, last_active FROM user_profiles
+WHERE user_id = ANY($1::text[])
+"""
+
+UPSERT_PROFILE = """
+INSERT INTO user_profiles (user_id, email, preferences)
+VALUES ($1, $2, $3::jsonb)
+ON CONFLICT (user_id) DO UPDATE SET email = EXCLUDED.email, preferences = EXCLUDED.preferences, updated_at = now()
+RETURNING user_id, email, preferences, created_date, last_active
+"""
+
+# Only move last_active forward, so out-of-order flushes from several workers are harmless
+UPDATE_LAST_ACTIVE = """
+UPDATE user_profiles SET last_active = $2
+WHERE user_id = $1 AND (last_active IS NULL OR last_active < $2)
+"""
+
+SELECT_UPDATED = """
+SELECT user_id, updated_at FROM user_profiles WHERE updated_at > $1
+"""
+
+# Re-check this far behind the newest update seen, so updates that commit out of
+# timestamp order or under a skewed clock are still picked up
+SYNC_OVERLAP = timedelta(seconds=5)
+
+DEFAULT_PREFERENCES = {"language": settings.default_language, "interfaceLanguage": settings.default_language}
+
+
+def _row_to_profile(row) -> UserProfile:
+    return UserProfile(
+        user_id=row["user_id"],
+        email=row["email"],
+        preferences=json.loads(row["preferences"]),
+        created_date=row["created_date"],
+        last_active=row["last_active"],
+    )
+
+
+def default_profile(user_id: str) -> UserProfile:
+    """Profile returned for users who have not saved one yet."""
+    return UserProfile(user_id=user_id, preferences=dict(DEFAULT_PREFERENCES))
+
+
+class ProfileService:
+    """
+    Postgres-backed user profiles with a per-worker TTL cache.
+
+    Lookups are served from the cache (including "no profile" results) and
+    misses in `get_many` are fetched with a single query. Profile updates
+    refresh the cache entry, and every `sync_interval` seconds each worker
+    drops its cached copies of profiles updated through other workers. A
+    per-user generation keeps a read that raced an update from caching the
+    old row. Activity is recorded in memory by `touch` and written as one
+    batched `last_active` update per user every `flush_interval` seconds.
+    """
+
+    def __init__(
+        self,
+        db: DatabaseService,
+        cache_ttl: int = settings.profile_cache_ttl,
+        cache_size: int = settings.profile_cache_size,
+        flush_interval: float = settings.profile_flush_interval,
+        sync_interval: float = settings.profile_sync_interval,
+    ):
+        self.db = db
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.flush_interval = flush_interval
+        self.sync_interval = sync_interval
+        self._cache: "OrderedDict[str, Tuple[float, Optional[UserProfile]]]" = OrderedDict()
+        self._last_active: Dict[str, datetime] = {}
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._sync_task: Optional[asyncio.Task] = None
+        self._synced_until = datetime.now(timezone.utc)
+        # Bumped whenever a user's cached profile is invalidated; only needed while fetches are in flight
+        self._generations: Dict[str, int] = {}
+        self._fetches = 0
+
+    async def init_schema(self):
+        """Create the profile table if it does not exist."""
+        await self.db.execute_command(CREATE_TABLE)
+        await self.db.execute_command(ADD_UPDATED_AT)
+        await self.db.execute_command(CREATE_UPDATED_AT_INDEX)
+
+    def start(self):
+        """Start the background last_active flush and cache sync loops."""
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+        if self._sync_task is None:
+            self._sync_task = asyncio.create_task(self._sync_loop())
+
+    async def stop(self):
+        """Stop the background loops and write out pending activity."""
+        for task in (self._flush_task, self._sync_task):
+            if task is not None:
+                task.cancel()
+                with suppress(asyncio.CancelledError):
+                    await task
+        self._flush_task = self._sync_task = None
+        await self.flush()
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def _sync_loop(self):
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                await self.sync()
+            except Exception:
+                logger.error("Failed to check for updated profiles", exc_info=True)
+
+    async def sync(self):
+        """Drop cached profiles that were updated since the last check, e.g. through another worker."""
+        rows = await self.db.execute_query(SELECT_UPDATED, self._synced_until - SYNC_OVERLAP)
+        for row in rows:
+            self.invalidate(row["user_id"])
+            self._synced_until = max(self._synced_until, row["updated_at"])
+
+    async def flush(self):
+        """Write buffered last_active timestamps in one batch."""
+        async with self._flush_lock:
+            if not self._last_active:
+                return
+            pending, self._last_active = self._last_active, {}
+            try:
+                await self.db.execute_many(UPDATE_LAST_ACTIVE, list(pending.items()))
+            except Exception:
+                logger.error("Failed to flush last_active updates, will retry", exc_info=True)
+                for user_id, last_active in pending.items():
+                    self._last_active.setdefault(user_id, last_active)
+
+    def touch(self, user_id: str):
+        """Record that the user was active; written on the next flush."""
+        now = datetime.now(timezone.utc)
+        self._last_active[user_id] = now
+
+        cached = self._cache.get(user_id)
+        if cached is not None and cached[1] is not None:
+            cached[1].last_active = now
+
+    def _cache_get(self, user_id: str) -> Tuple[bool, Optional[UserProfile]]:
+        cached = self._cache.get(user_id)
+        if cached is None:
+            return False, None
+        expires_at, profile = cached
+        if time.monotonic() > expires_at:
+            del self._cache[user_id]
+            return False, None
+        self._cache.move_to_end(user_id)
+        return True, profile
+
+    def _cache_put(self, user_id: str, profile: Optional[UserProfile]):
+        self._cache[user_id] = (time.monotonic() + self.cache_ttl, profile)
+        self._cache.move_to_end(user_id)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def invalidate(self, user_id: str):
+        """Drop a cached profile so the next lookup reads the database."""
+        self._cache.pop(user_id, None)
+        if self._fetches:
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+
+    async def get(self, user_id: str) -> Optional[UserProfile]:
+        """Return the stored profile, or None if the user has not saved one."""
+        return (await self.get_many([user_id])).get(user_id)
+
+    async def get_many(self, user_ids: Iterable[str]) -> Dict[str, UserProfile]:
+        """Return stored profiles for many users, fetching cache misses in one query."""
+        profiles: Dict[str, UserProfile] = {}
+        missing = []
+        for user_id in dict.fromkeys(user_ids):
+            hit, profile = self._cache_get(user_id)
+            if not hit:
+                missing.append(user_id)
+            elif profile is not None:
+                profiles[user_id] = profile
+
+        if missing:
+            generations = {user_id: self._generations.get(user_id, 0) for user_id in missing}
+            self._fetches += 1
+            try:
+                rows = await self.db.execute_query(SELECT_PROFILES, missing)
+            finally:
+                self._fetches -= 1
+            found = {row["user_id"]: _row_to_profile(row) for row in rows}
+            for user_id in missing:
+                profile = found.get(user_id)
+                if profile is not None and user_id in self._last_active:
+                    profile.last_active = self._last_active[user_id]
+                # Users without a profile are cached too, so they do not hit the database every request.
+                # A profile invalidated while the query ran may be stale, so it is returned but not cached.
+                if self._generations.get(user_id, 0) == generations[user_id]:
+                    self._cache_put(user_id, profile)
+                if profile is not None:
+                    profiles[user_id] = profile
+            if not self._fetches:
+                self._generations.clear()
+
+        return profiles
+
+    async def get_preferences(self, user_id: str) -> dict:
+        """Return the user's preferences merged over the defaults."""
+        profile = await self.get(user_id)
+        return {**DEFAULT_PREFERENCES, **((profile and profile.preferences) or {})}
+
+    async def update(self, profile: UserProfile) -> UserProfile:
+        """Create or update a profile and refresh its cache entry."""
+        self.invalidate(profile.user_id)
+        try:
+            row = await self.db.execute_query_row(
+                UPSERT_PROFILE,
+                profile.user_id,
+                profile.email,
+                json.dumps(profile.preferences or {}),
+            )
+        except asyncpg.UniqueViolationError:
+            raise ValueError("Email is already in use by another profile")
+        finally:
+            # Reads that started before the upsert committed may still return the old row
+            self.invalidate(profile.user_id)
+        updated = _row_to_profile(row)
+        if updated.user_id in self._last_active:
+            updated.last_active = self._last_active[updated.user_id]
+        self._cache_put(updated.user_id, updated)
+        return updated
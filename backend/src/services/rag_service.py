@@ -2,12 +2,109 @@ from qdrant_client import QdrantClient
 from qdrant_client.http import models
 from langchain.vectorstores import Qdrant
 from langchain.embeddings import OpenAIEmbeddings
+import numpy as np
 import os
-from typing import List, Optional
+from datetime import datetime, timezone
+from typing import List, Optional, Union
+from src.config import Settings, settings
+from src.services.corpus_snapshot import CorpusSnapshot, SnapshotManager
+from src.services.embedding_service import get_embedding_dimension, get_embedding_reducer
+
+# Named vectors used when reduced search vectors are re-ranked with full embeddings
+SHORT_VECTOR = "short"
+FULL_VECTOR = "full"
+
+# Payload field that partitions the collection by edition language
+LANGUAGE_FIELD = "language"
+
+# Payload field recording which model embedded a point
+MODEL_FIELD = "embedding_model"
+
+
+def build_quantization_config(config: Settings) -> Optional[models.QuantizationConfig]:
+    """Build the Qdrant quantization config selected in settings."""
+    quantization = config.qdrant_quantization.lower()
+    if quantization == "none":
+        return None
+    if quantization == "scalar":
+        return models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(
+                type=models.ScalarType.INT8,
+                quantile=0.99,
+                always_ram=config.qdrant_quantization_always_ram,
+            )
+        )
+    if quantization == "binary":
+        return models.BinaryQuantization(
+            binary=models.BinaryQuantizationConfig(
+                always_ram=config.qdrant_quantization_always_ram,
+            )
+        )
+    raise ValueError(f"Unsupported QDRANT_QUANTIZATION value: {config.qdrant_quantization}")
+
+
+def build_collection_params(config: Settings, vector_size: int, full_vector_size: Optional[int] = None) -> dict:
+    """
+    Build the keyword arguments for `QdrantClient.create_collection` from settings.
+
+    When `full_vector_size` is given the collection holds a named, HNSW-indexed
+    search vector plus an unindexed on-disk full vector used only for re-ranking.
+    Quantization is set on the search vector rather than the collection, so the
+    full vector never gets a quantized in-RAM copy.
+    """
+    vectors_config = models.VectorParams(
+        size=vector_size,
+        distance=models.Distance.COSINE,
+        on_disk=config.qdrant_vectors_on_disk,
+        quantization_config=build_quantization_config(config),
+    )
+    if full_vector_size:
+        vectors_config = {
+            SHORT_VECTOR: vectors_config,
+            FULL_VECTOR: models.VectorParams(
+                size=full_vector_size,
+                distance=models.Distance.COSINE,
+                on_disk=True,
+                hnsw_config=models.HnswConfigDiff(m=0),
+            ),
+        }
+    return {
+        "vectors_config": vectors_config,
+        "hnsw_config": models.HnswConfigDiff(
+            m=config.qdrant_hnsw_m,
+            ef_construct=config.qdrant_hnsw_ef_construct,
+            payload_m=config.qdrant_hnsw_payload_m,
+        ),
+        "on_disk_payload": config.qdrant_payload_on_disk,
+    }
+
+
+def build_search_params(config: Settings) -> models.SearchParams:
+    """Build search-time parameters (HNSW ef and quantized re-scoring) from settings."""
+    quantization = None
+    if config.qdrant_quantization.lower() != "none":
+        quantization = models.QuantizationSearchParams(
+            rescore=config.qdrant_rescore,
+            oversampling=config.qdrant_oversampling,
+        )
+    return models.SearchParams(hnsw_ef=config.qdrant_search_ef, quantization=quantization)
+
+
+def _vector_layout(vectors_config) -> Union[int, dict]:
+    """Reduce a vectors config to its layout: the size of an unnamed vector, or name -> size."""
+    if isinstance(vectors_config, dict):
+        return {name: params.size for name, params in vectors_config.items()}
+    return vectors_config.size
 
 
 class RAGService:
-    def __init__(self):
+    def __init__(self, check_layout: bool = True, snapshots: Optional[SnapshotManager] = None):
+        """
+        `check_layout=False` skips verifying the live collection against the settings,
+        for the scripts that rebuild or re-index it. With `snapshots`, two-stage search
+        re-ranks with the full vectors in the mapped corpus snapshot instead of
+        fetching them from Qdrant.
+        """
         # Initialize Qdrant client
         self.client = QdrantClient(
             host=os.getenv("QDRANT_HOST", "localhost"),
@@ -15,28 +112,219 @@ class RAGService:
         )
         
         # Initialize embeddings
-        self.embeddings = OpenAIEmbeddings()
+        self.embeddings = OpenAIEmbeddings(model=settings.embedding_model)
+        
+        # Vector sizes follow the embedding model and the optional reduction
+        self.full_vector_size = get_embedding_dimension(settings.embedding_model)
+        self.reducer = get_embedding_reducer()
+        self.vector_size = self.reducer.dimensions if self.reducer else self.full_vector_size
+        self.two_stage = self.reducer is not None and settings.embedding_rerank_full
+        self.snapshots = snapshots
         
         # Specify the collection name for textbook content
         self.collection_name = "textbook_content"
+        self.search_params = build_search_params(settings)
         
         # Create collection if it doesn't exist
-        self._ensure_collection_exists()
+        self._ensure_collection_exists(check_layout)
     
-    def _ensure_collection_exists(self):
+    def _ensure_collection_exists(self, check_layout: bool = True):
         """Ensure the Qdrant collection exists with proper configuration."""
         try:
             # Try to get collection info to see if it exists
-            self.client.get_collection(self.collection_name)
+            info = self.client.get_collection(self.collection_name)
         except:
-            # Collection doesn't exist, create it
-            self.client.create_collection(
-                collection_name=self.collection_name,
-                vectors_config=models.VectorParams(size=1536, distance=models.Distance.COSINE),
+            # Collection doesn't exist: recover a rebuild interrupted right after it
+            # dropped a pre-alias collection, otherwise create one behind the alias
+            versions = self._versioned_collections()
+            self._switch_alias(versions[-1] if versions else self._create_versioned_collection())
+            return
+
+        # Collections created before language partitioning lack the payload index
+        if LANGUAGE_FIELD not in (info.payload_schema or {}):
+            self._create_language_index(self.collection_name)
+
+        if check_layout:
+            self._check_layout(info)
+
+    def _check_layout(self, info):
+        """Fail fast when the collection was built for different embedding settings than the current ones."""
+        expected = _vector_layout(build_collection_params(
+            settings,
+            self.vector_size,
+            full_vector_size=self.full_vector_size if self.two_stage else None,
+        )["vectors_config"])
+        actual = _vector_layout(info.config.params.vectors)
+
+        records, _ = self.client.scroll(collection_name=self.collection_name, limit=1, with_payload=[MODEL_FIELD])
+        # Points indexed before the model was recorded are assumed to match
+        stored_model = records[0].payload.get(MODEL_FIELD) if records else None
+        if stored_model not in (None, settings.embedding_model):
+            raise RuntimeError(
+                f"Collection '{self.collection_name}' was embedded with {stored_model}, but EMBEDDING_MODEL is "
+                f"{settings.embedding_model}; re-run src.scripts.index_content"
+            )
+
+        if actual != expected:
+            # Rebuilding needs full-size embeddings; a collection of reduced vectors has to be re-indexed
+            full_size = actual.get(FULL_VECTOR) if isinstance(actual, dict) else actual
+            remedy = "src.scripts.migrate_collection" if full_size == self.full_vector_size else "src.scripts.index_content"
+            raise RuntimeError(
+                f"Collection '{self.collection_name}' has vector layout {actual}, but the embedding settings "
+                f"require {expected}; run {remedy} to rebuild it"
             )
+
+    def _create_collection(self, collection_name: str):
+        """Create a collection using the vector, HNSW and quantization settings."""
+        self.client.create_collection(
+            collection_name=collection_name,
+            **build_collection_params(
+                settings,
+                self.vector_size,
+                full_vector_size=self.full_vector_size if self.two_stage else None,
+            ),
+        )
+        self._create_language_index(collection_name)
+
+    def _create_language_index(self, collection_name: str):
+        """Index the language payload so per-language searches only visit that partition."""
+        self.client.create_payload_index(
+            collection_name=collection_name,
+            field_name=LANGUAGE_FIELD,
+            field_schema=models.PayloadSchemaType.KEYWORD,
+        )
+
+    def _create_versioned_collection(self) -> str:
+        """Create a new versioned collection for the alias to point at."""
+        version = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+        collection_name = f"{self.collection_name}_v{version}"
+        self._create_collection(collection_name)
+        return collection_name
+
+    def _versioned_collections(self) -> List[str]:
+        """Names of the versioned collections, oldest first."""
+        prefix = f"{self.collection_name}_v"
+        return sorted(
+            collection.name for collection in self.client.get_collections().collections
+            if collection.name.startswith(prefix)
+        )
+
+    def _alias_target(self) -> Optional[str]:
+        """The collection the alias points at, or None while the name is a plain collection."""
+        for alias in self.client.get_aliases().aliases:
+            if alias.alias_name == self.collection_name:
+                return alias.collection_name
+        return None
+
+    def _switch_alias(self, collection_name: str, replace: bool = False):
+        """Atomically point the collection alias at `collection_name`."""
+        operations = []
+        if replace:
+            operations.append(
+                models.DeleteAliasOperation(delete_alias=models.DeleteAlias(alias_name=self.collection_name))
+            )
+        operations.append(
+            models.CreateAliasOperation(
+                create_alias=models.CreateAlias(collection_name=collection_name, alias_name=self.collection_name)
+            )
+        )
+        # Qdrant applies all operations of one request atomically
+        self.client.update_collection_aliases(change_aliases_operations=operations)
+
+    def _point_vector(self, embedding: List[float]) -> Union[List[float], dict]:
+        """Build the stored vector(s) for a full-size embedding."""
+        if not self.reducer:
+            return embedding
+        if self.two_stage:
+            return {SHORT_VECTOR: self.reducer.reduce(embedding), FULL_VECTOR: embedding}
+        return self.reducer.reduce(embedding)
+
+    def _stored_full_vector(self, vector: Union[List[float], dict]) -> List[float]:
+        """Recover the full-size embedding from a stored point, whatever its layout."""
+        if isinstance(vector, dict):
+            vector = vector.get(FULL_VECTOR)
+        if vector is None or len(vector) != self.full_vector_size:
+            raise ValueError(
+                "Stored points do not contain full-size embeddings; re-run the indexer instead of rebuilding"
+            )
+        return vector
+
+    def _copy_points(self, source: str, target: str, batch_size: int, vector_builder) -> int:
+        """Copy all points from one collection to another, re-deriving vectors from full embeddings."""
+        copied = 0
+        offset = None
+        while True:
+            records, offset = self.client.scroll(
+                collection_name=source,
+                limit=batch_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=True,
+            )
+            if records:
+                self.client.upsert(
+                    collection_name=target,
+                    points=[
+                        models.PointStruct(
+                            id=record.id,
+                            vector=vector_builder(self._stored_full_vector(record.vector)),
+                            # Points indexed before language partitioning are default-language content
+                            payload={LANGUAGE_FIELD: settings.default_language, **record.payload},
+                        )
+                        for record in records
+                    ],
+                )
+                copied += len(records)
+            if offset is None:
+                return copied
+
+    def rebuild_collection(self, batch_size: int = 256) -> int:
+        """
+        Rebuild the collection so it picks up the current collection settings.
+
+        Points are copied into a new versioned collection and the alias is switched
+        to it atomically, so the live collection is never deleted before the copy is
+        complete and searches never see a missing collection. Versioned collections
+        the alias does not point at are leftovers of an interrupted rebuild and are
+        dropped first. Returns the number of points.
+        """
+        rebuilt = self.begin_rebuild()
+        copied = self._copy_points(self.collection_name, rebuilt, batch_size, self._point_vector)
+        self.finish_rebuild(rebuilt)
+        return copied
+
+    def begin_rebuild(self) -> str:
+        """
+        Create an empty versioned collection to fill and later publish with `finish_rebuild`.
+
+        Used directly by the indexer, so content that no longer exists does not
+        survive a re-index.
+        """
+        current = self._alias_target()
+        for collection_name in self._versioned_collections():
+            if collection_name != current:
+                self.client.delete_collection(collection_name)
+        return self._create_versioned_collection()
+
+    def finish_rebuild(self, rebuilt: str):
+        """Atomically point the alias at a filled collection from `begin_rebuild` and drop the old one."""
+        current = self._alias_target()
+        if current is None:
+            # Collections created before aliases were used: the plain collection has to go
+            # before the alias can take its name. The data is already safe in `rebuilt`.
+            self.client.delete_collection(self.collection_name)
+        self._switch_alias(rebuilt, replace=current is not None)
+        if current is not None:
+            self.client.delete_collection(current)
     
-    def add_texts(self, texts: List[str], metadatas: Optional[List[dict]] = None, ids: Optional[List[str]] = None):
-        """Add texts to the Qdrant collection."""
+    def add_texts(
+        self,
+        texts: List[str],
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+        collection_name: Optional[str] = None,
+    ) -> List[List[float]]:
+        """Add texts to the Qdrant collection (or another one, e.g. during a rebuild) and return their full-size embeddings."""
         # Generate embeddings for the texts
         embedding_vectors = [self.embeddings.embed_query(text) for text in texts]
         
@@ -49,9 +337,11 @@ class RAGService:
             points.append(
                 models.PointStruct(
                     id=point_id,
-                    vector=embedding,
+                    vector=self._point_vector(embedding),
                     payload={
                         "content": text,
+                        LANGUAGE_FIELD: settings.default_language,
+                        MODEL_FIELD: settings.embedding_model,
                         **metadata
                     }
                 )
@@ -59,21 +349,37 @@ class RAGService:
         
         # Upload points to Qdrant
         self.client.upsert(
-            collection_name=self.collection_name,
+            collection_name=collection_name or self.collection_name,
             points=points
         )
+        
+        return embedding_vectors
     
-    def similarity_search(self, query: str, k: int = 4, filter: Optional[models.Filter] = None) -> List[dict]:
-        """Search for similar content in the Qdrant collection."""
+    def similarity_search(
+        self,
+        query: str,
+        k: int = 4,
+        filter: Optional[models.Filter] = None,
+        language: Optional[str] = None,
+    ) -> List[dict]:
+        """Search for similar content in the Qdrant collection, optionally within one language partition."""
         query_embedding = self.embeddings.embed_query(query)
         
-        search_results = self.client.search(
-            collection_name=self.collection_name,
-            query_vector=query_embedding,
-            limit=k,
-            query_filter=filter,
-            with_payload=True
-        )
+        if language:
+            condition = models.FieldCondition(key=LANGUAGE_FIELD, match=models.MatchValue(value=language))
+            filter = models.Filter(must=[condition, filter] if filter else [condition])
+        
+        if self.two_stage:
+            search_results = self._two_stage_search(query_embedding, k, filter)
+        else:
+            search_results = self.client.search(
+                collection_name=self.collection_name,
+                query_vector=self._point_vector(query_embedding),
+                limit=k,
+                query_filter=filter,
+                search_params=self.search_params,
+                with_payload=True
+            )
         
         results = []
         for result in search_results:
@@ -83,4 +389,57 @@ class RAGService:
                 "metadata": {k: v for k, v in result.payload.items() if k != "content"}
             })
         
-        return results
\ No newline at end of file
+        return results
+    
+    def _rerank_snapshot(self) -> Optional[CorpusSnapshot]:
+        """The current snapshot if it holds full vectors from the configured embedding model."""
+        snapshot = self.snapshots.current() if self.snapshots else None
+        if (
+            snapshot is None
+            or snapshot.embeddings is None
+            or snapshot.embedding_model != settings.embedding_model
+            or snapshot.embeddings.shape[1] != self.full_vector_size
+        ):
+            return None
+        return snapshot
+    
+    def _full_vectors(self, candidates, snapshot: Optional[CorpusSnapshot]) -> np.ndarray:
+        """Full vectors of the candidates: from the snapshot where it has them, otherwise from Qdrant."""
+        if snapshot is None:
+            return np.asarray([candidate.vector[FULL_VECTOR] for candidate in candidates], dtype=np.float32)
+        
+        rows = snapshot.embedding_rows([candidate.id for candidate in candidates])
+        missing = [candidate.id for candidate, row in zip(candidates, rows) if row is None]
+        fetched = {}
+        if missing:
+            # Points indexed after the snapshot was published
+            records = self.client.retrieve(self.collection_name, ids=missing, with_vectors=[FULL_VECTOR])
+            fetched = {str(record.id): record.vector[FULL_VECTOR] for record in records}
+        return np.stack([
+            snapshot.embeddings[row] if row is not None else np.asarray(fetched[str(candidate.id)], dtype=np.float32)
+            for candidate, row in zip(candidates, rows)
+        ])
+    
+    def _two_stage_search(self, query_embedding: List[float], k: int, filter: Optional[models.Filter]):
+        """Retrieve candidates with the reduced vector, then re-rank them by full-vector cosine."""
+        snapshot = self._rerank_snapshot()
+        candidates = self.client.search(
+            collection_name=self.collection_name,
+            query_vector=models.NamedVector(name=SHORT_VECTOR, vector=self.reducer.reduce(query_embedding)),
+            limit=k * settings.embedding_rerank_factor,
+            query_filter=filter,
+            search_params=self.search_params,
+            with_payload=True,
+            # The snapshot already maps the full vectors, so Qdrant need not read them from disk
+            with_vectors=False if snapshot is not None else [FULL_VECTOR],
+        )
+        if not candidates:
+            return []
+        
+        query = np.asarray(query_embedding, dtype=np.float32)
+        full_vectors = self._full_vectors(candidates, snapshot)
+        scores = full_vectors @ query / (np.linalg.norm(full_vectors, axis=1) * np.linalg.norm(query))
+        
+        for candidate, score in zip(candidates, scores):
+            candidate.score = float(score)
+        return sorted(candidates, key=lambda candidate: candidate.score, reverse=True)[:k]
\ No newline at end of file
@@ -0,0 +1,49 @@
+import re
+import uuid
+from typing import List
+
+
+FRONT_MATTER = re.compile(r"\A---\n.*?\n---\n", re.DOTALL)
+
+
+def strip_front_matter(markdown: str) -> str:
+    """Remove a Docusaurus YAML front matter block from a markdown document."""
+    return FRONT_MATTER.sub("", markdown, count=1)
+
+
+def chunk_id(language: str, chapter_id: str, index: int) -> str:
+    """Stable point ID of a chapter chunk, shared by the Qdrant index and the corpus snapshot."""
+    # Qdrant point IDs must be UUIDs; derive them so they are stable across re-indexing
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{language}/{chapter_id}/{index}"))
+
+
+def chunk_text(text: str, max_chars: int = 1000, overlap: int = 200) -> List[str]:
+    """
+    Split text into chunks of at most `max_chars`, packing whole paragraphs where possible.
+
+    Consecutive chunks share up to `overlap` trailing characters so that sentences cut at
+    a boundary remain retrievable from either side.
+    """
+    paragraphs = [paragraph.strip() for paragraph in text.split("\n\n") if paragraph.strip()]
+    chunks = []
+    current = ""
+
+    for paragraph in paragraphs:
+        # Paragraphs longer than a chunk are split on hard character boundaries
+        while len(paragraph) > max_chars:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(paragraph[:max_chars])
+            paragraph = paragraph[max_chars - overlap:]
+
+        if current and len(current) + len(paragraph) + 2 > max_chars:
+            chunks.append(current)
+            tail = current[-overlap:] if overlap else ""
+            current = f"{tail}\n\n{paragraph}" if tail and len(tail) + len(paragraph) + 2 <= max_chars else paragraph
+        else:
+            current = f"{current}\n\n{paragraph}" if current else paragraph
+
+    if current:
+        chunks.append(current)
+    return chunks
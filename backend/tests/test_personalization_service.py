@@ -0,0 +1,194 @@
+import asyncio
+import json
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+import src.services.personalization_service as personalization
+from src.models.personalization import PersonalizationDelta, PersonalizedChapterView
+from src.services.personalization_service import PersonalizationService
+
+
+class InMemoryDatabase:
+    """Understands the personalization statements and can hold or fail writes."""
+
+    def __init__(self):
+        self.items = {}
+        self.views = {}
+        self.write_gate = None
+        self.fail_writes = False
+        self.batches = []
+
+    async def execute_command(self, command, *args):
+        return "OK"
+
+    async def execute_query(self, query, user_id, chapter_id):
+        assert query is personalization.SELECT_ITEMS
+        rows = [
+            {"kind": kind, "item_key": item_key, "data": json.dumps(data), "updated_at": datetime.now(timezone.utc)}
+            for (user, chapter, kind, item_key), data in self.items.items()
+            if (user, chapter) == (user_id, chapter_id)
+        ]
+        if (user_id, chapter_id) in self.views:
+            rows.append({"kind": "view", "item_key": "", "data": "{}", "updated_at": self.views[(user_id, chapter_id)]})
+        return rows
+
+    async def execute_many(self, command, args_list):
+        if not args_list:
+            return
+        if self.write_gate is not None:
+            await self.write_gate.wait()
+        if self.fail_writes:
+            raise ConnectionError("database unavailable")
+        self.batches.append(command)
+        for args in args_list:
+            if command is personalization.UPSERT_ITEM:
+                self.items[args[:4]] = json.loads(args[4])
+            elif command is personalization.DELETE_ITEM:
+                self.items.pop(args, None)
+            elif command is personalization.DELETE_UNKEPT_ITEMS:
+                user_id, chapter_id, kept = args
+                for key in [key for key in self.items if key[:2] == (user_id, chapter_id)]:
+                    if f"{key[2]}:{key[3]}" not in kept:
+                        del self.items[key]
+            elif command is personalization.UPSERT_VIEW:
+                user_id, chapter_id, viewed_at = args
+                self.views[(user_id, chapter_id)] = max(viewed_at, self.views.get((user_id, chapter_id), viewed_at))
+
+
+def bookmark(item_id, position=1):
+    return {"id": item_id, "position": position}
+
+
+def stored_ids(db):
+    return sorted(key[3] for key in db.items)
+
+
+def test_delta_is_visible_immediately_and_written_in_one_batch():
+    async def scenario():
+        db = InMemoryDatabase()
+        service = PersonalizationService(db)
+        await service.apply_delta("u", "c", PersonalizationDelta(addBookmarks=[bookmark("a")]))
+        view = await service.apply_delta("u", "c", PersonalizationDelta(addBookmarks=[bookmark("b")]))
+        assert [item.id for item in view.bookmarks] == ["a", "b"]
+        assert db.items == {}
+
+        await service.flush()
+        assert stored_ids(db) == ["a", "b"]
+        assert db.batches == [personalization.UPSERT_ITEM]
+
+        await service.apply_delta("u", "c", PersonalizationDelta(removeBookmarks=["a"]))
+        await service.flush()
+        assert stored_ids(db) == ["b"]
+
+    asyncio.run(scenario())
+
+
+def test_replace_from_another_worker_deletes_items_it_has_not_seen():
+    async def scenario():
+        db = InMemoryDatabase()
+        first, second = PersonalizationService(db), PersonalizationService(db)
+        # The second worker caches the view before the first one adds to it
+        await second.get_view("u", "c")
+        await first.apply_delta("u", "c", PersonalizationDelta(addBookmarks=[bookmark("a")]))
+        await first.flush()
+
+        view = await second.replace_view("u", "c", PersonalizedChapterView(userId="u", chapterId="c"))
+        await second.flush()
+        assert view.bookmarks == []
+        assert db.items == {}
+
+    asyncio.run(scenario())
+
+
+def test_replace_keeps_items_with_the_same_position_and_rejects_duplicate_ids():
+    async def scenario():
+        db = InMemoryDatabase()
+        service = PersonalizationService(db)
+        notes = [
+            {"id": "n1", "position": 4, "content": "first"},
+            {"id": "n2", "position": 4, "content": "second"},
+        ]
+        view = await service.replace_view("u", "c", PersonalizedChapterView(userId="u", chapterId="c", annotations=notes))
+        await service.flush()
+        assert [item.id for item in view.annotations] == ["n1", "n2"]
+        assert stored_ids(db) == ["n1", "n2"]
+
+        duplicate = PersonalizedChapterView(userId="u", chapterId="c", bookmarks=[bookmark("x", 1), bookmark("x", 2)])
+        with pytest.raises(ValueError):
+            await service.replace_view("u", "c", duplicate)
+        assert stored_ids(db) == ["n1", "n2"]
+
+    asyncio.run(scenario())
+
+
+def test_failed_flush_is_requeued_and_stays_visible():
+    async def scenario():
+        db = InMemoryDatabase()
+        service = PersonalizationService(db, cache_ttl=0)
+        await service.apply_delta("u", "c", PersonalizationDelta(addBookmarks=[bookmark("a")]))
+
+        db.fail_writes = True
+        await service.flush()
+        await service.apply_delta("u", "c", PersonalizationDelta(addBookmarks=[bookmark("b")]))
+        # The cache entry has expired, so this re-reads the empty database and overlays the pending changes
+        view = await service.get_view("u", "c")
+        assert [item.id for item in view.bookmarks] == ["a", "b"]
+
+        db.fail_writes = False
+        await service.flush()
+        assert stored_ids(db) == ["a", "b"]
+
+    asyncio.run(scenario())
+
+
+def test_read_during_inflight_flush_sees_the_batch():
+    async def scenario():
+        db = InMemoryDatabase()
+        service = PersonalizationService(db, cache_ttl=0.01)
+        await service.apply_delta("u", "c", PersonalizationDelta(addBookmarks=[bookmark("a")]))
+        time.sleep(0.02)
+
+        db.write_gate = asyncio.Event()
+        flush = asyncio.create_task(service.flush())
+        await asyncio.sleep(0)
+        view = await service.get_view("u", "c")
+        assert [item.id for item in view.bookmarks] == ["a"]
+
+        db.write_gate.set()
+        await flush
+        time.sleep(0.02)
+        assert [item.id for item in (await service.get_view("u", "c")).bookmarks] == ["a"]
+
+    asyncio.run(scenario())
+
+
+def test_last_viewed_tracks_reads_not_writes():
+    async def scenario():
+        db = InMemoryDatabase()
+        service = PersonalizationService(db)
+        view = await service.apply_delta("u", "c", PersonalizationDelta(addBookmarks=[bookmark("a")]))
+        assert view.lastViewed is None
+
+        viewed = (await service.get_view("u", "c")).lastViewed
+        assert viewed is not None
+        await service.flush()
+        assert db.views[("u", "c")] == viewed
+        assert (await PersonalizationService(db).get_view("u", "c")).lastViewed >= viewed
+
+    asyncio.run(scenario())
+
+
+def test_items_stored_before_ids_use_their_key_as_id():
+    async def scenario():
+        db = InMemoryDatabase()
+        db.items[("u", "c", "bookmark", "120")] = {"position": 120, "label": None}
+        service = PersonalizationService(db)
+        assert [item.id for item in (await service.get_view("u", "c")).bookmarks] == ["120"]
+
+        await service.apply_delta("u", "c", PersonalizationDelta(removeBookmarks=["120"]))
+        await service.flush()
+        assert db.items == {}
+
+    asyncio.run(scenario())
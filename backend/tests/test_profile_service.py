@@ -0,0 +1,116 @@
+import asyncio
+import json
+from datetime import datetime, timezone
+
+import src.services.profile_service as profiles
+from src.models.user import UserProfile
+from src.services.profile_service import ProfileService
+
+
+class InMemoryDatabase:
+    """Understands the profile statements; `select_gate` holds profile SELECTs after they read the rows."""
+
+    def __init__(self):
+        self.rows = {}
+        self.select_gate = None
+        self.selects = 0
+
+    async def execute_command(self, command, *args):
+        return "OK"
+
+    async def execute_query(self, query, arg):
+        if query is profiles.SELECT_UPDATED:
+            return [
+                {"user_id": user_id, "updated_at": row["updated_at"]}
+                for user_id, row in self.rows.items()
+                if row["updated_at"] > arg
+            ]
+        assert query is profiles.SELECT_PROFILES
+        self.selects += 1
+        rows = [dict(self.rows[user_id]) for user_id in arg if user_id in self.rows]
+        if self.select_gate is not None:
+            await self.select_gate.wait()
+        return rows
+
+    async def execute_query_row(self, query, user_id, email, preferences):
+        assert query is profiles.UPSERT_PROFILE
+        await asyncio.sleep(0)
+        now = datetime.now(timezone.utc)
+        created = self.rows.get(user_id, {}).get("created_date", now)
+        self.rows[user_id] = {
+            "user_id": user_id,
+            "email": email,
+            "preferences": preferences,
+            "created_date": created,
+            "last_active": None,
+            "updated_at": now,
+        }
+        return self.rows[user_id]
+
+    async def execute_many(self, command, args_list):
+        pass
+
+
+def save(db, user_id, language):
+    return ProfileService(db).update(UserProfile(user_id=user_id, preferences={"language": language}))
+
+
+def test_lookups_are_cached_including_missing_profiles():
+    async def scenario():
+        db = InMemoryDatabase()
+        await save(db, "known", "es")
+        service = ProfileService(db)
+
+        assert set(await service.get_many(["known", "unknown"])) == {"known"}
+        assert set(await service.get_many(["known", "unknown"])) == {"known"}
+        assert db.selects == 1
+        assert (await service.get_preferences("unknown"))["language"] == profiles.DEFAULT_PREFERENCES["language"]
+
+    asyncio.run(scenario())
+
+
+def test_get_many_racing_update_does_not_cache_the_old_row():
+    async def scenario():
+        db = InMemoryDatabase()
+        await save(db, "u", "en")
+        service = ProfileService(db)
+
+        db.select_gate = asyncio.Event()
+        read = asyncio.create_task(service.get_preferences("u"))
+        await asyncio.sleep(0)
+        await service.update(UserProfile(user_id="u", preferences={"language": "ur"}))
+        db.select_gate.set()
+
+        # The racing read may return what it saw, but must not replace the newer cached profile
+        assert (await read)["language"] == "en"
+        db.select_gate = None
+        assert (await service.get_preferences("u"))["language"] == "ur"
+
+    asyncio.run(scenario())
+
+
+def test_sync_drops_profiles_updated_by_another_worker():
+    async def scenario():
+        db = InMemoryDatabase()
+        await save(db, "u", "en")
+        first, second = ProfileService(db), ProfileService(db)
+        assert (await second.get_preferences("u"))["language"] == "en"
+
+        await first.update(UserProfile(user_id="u", preferences={"language": "es"}))
+        assert (await second.get_preferences("u"))["language"] == "en"
+        await second.sync()
+        assert (await second.get_preferences("u"))["language"] == "es"
+
+    asyncio.run(scenario())
+
+
+def test_update_keeps_buffered_activity():
+    async def scenario():
+        db = InMemoryDatabase()
+        service = ProfileService(db)
+        service.touch("u")
+        updated = await service.update(UserProfile(user_id="u", preferences={"language": "en"}))
+        assert updated.last_active is not None
+        assert json.loads(db.rows["u"]["preferences"]) == {"language": "en"}
+
+    asyncio.run(scenario())